@@ -0,0 +1,101 @@
+#!/usr/local/bin/python3
+
+
+# Compare the combining engines of the Quine McCluskey prime implicant
+# generation: pairwise and bucketed on Terms, bucketed, numpy, parallel
+# (numpy over all the cores) and streaming on Implicants. Times are in seconds, speedups are against pairwise.
+#
+# usage: python benchmarks/bench_combine.py [--density 0.25] [--seed 1]
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kmap_core import Implicant, SimplifyStats, Term, prime_implicants  # noqa: E402
+
+
+RUNS = [
+    ('pairwise', 'pairwise', Term),
+    ('bucketed', 'bucketed', Term),
+    ('implicant', 'bucketed', Implicant.from_term),
+    ('numpy', 'numpy', Implicant.from_term),
+    ('parallel', 'parallel', Implicant.from_term),
+    ('streaming', 'streaming', Implicant.from_term),
+]
+
+
+def random_terms(nov, density, seed):
+    rng = random.Random(seed)
+    minterms = [m for m in range(2 ** nov) if rng.random() < density]
+    return ["{1:0{0}b}".format(nov, m) for m in minterms]
+
+
+def time_engine(str_terms, engine, make=Term):
+    terms = [make(term) for term in str_terms]
+    for idx, term in enumerate(terms):
+        term.source = [idx]
+    start = time.perf_counter()
+    primes = prime_implicants(terms, engine)
+    return time.perf_counter() - start, primes
+
+
+def check_parallel(nov=12, density=0.9, seed=1):
+    """ The parallel engine must split the large rounds of a dense function
+    over its pool, even when the function has few minterms. """
+    str_terms = random_terms(nov, density, seed)
+    stats = SimplifyStats()
+    terms = [Implicant.from_term(term, [idx]) for idx, term in enumerate(str_terms)]
+    primes = prime_implicants(terms, 'parallel', stats, processes=2)
+    _, expected = time_engine(str_terms, 'numpy', Implicant.from_term)
+    assert set(map(str, primes)) == set(map(str, expected)), "parallel and numpy disagree"
+    assert stats.parallel_rounds, "no round of {} minterms used the pool".format(len(terms))
+    print("parallel: {} of {} rounds on the pool".format(stats.parallel_rounds, len(stats.rounds)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--density', type=float, default=0.25)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--variables', type=int, nargs='+', default=[6, 8, 10, 12])
+    parser.add_argument('--skip-pairwise-above', type=int, default=12,
+                        help="don't time the pairwise engine above this many variables")
+    args = parser.parse_args(argv)
+
+    prime_implicants([], 'numpy')  # load numpy outside of the timings
+    check_parallel()
+
+    header = "{:>4} {:>8} {:>8}".format("vars", "terms", "primes")
+    for name, _, _ in RUNS:
+        header += " {:>10} {:>8}".format(name, "speedup")
+    print(header)
+
+    for nov in args.variables:
+        str_terms = random_terms(nov, args.density, args.seed)
+        times, expected = [], None
+        for name, engine, make in RUNS:
+            if name == 'pairwise' and nov > args.skip_pairwise_above:
+                times.append(None)
+                continue
+            elapsed, primes = time_engine(str_terms, engine, make)
+            primes = set(map(str, primes))
+            assert expected is None or primes == expected, "engines disagree"
+            expected = primes
+            times.append(elapsed)
+
+        line = "{:>4} {:>8} {:>8}".format(nov, len(str_terms), len(expected))
+        for elapsed in times:
+            if elapsed is None:
+                line += " {:>10} {:>8}".format("-", "-")
+            elif times[0] is None:
+                line += " {:>10.4f} {:>8}".format(elapsed, "-")
+            else:
+                line += " {:>10.4f} {:>7.1f}x".format(elapsed, times[0] / elapsed)
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+#!/usr/local/bin/python3
+
+
+# Measure the import time and resident memory of the engine module
+# against the GUI module, each import runs in a fresh interpreter.
+# Run "python -m compileall ." first so that compiling is not timed.
+#
+# usage: python benchmarks/bench_import.py [--runs 20]
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import resource, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+      'tkinter' in sys.modules, 'numpy' in sys.modules)
+"""
+
+MODULES = ['kmap_core', 'kmap_cli', 'kmap_v4']
+
+
+def probe(module):
+    output = subprocess.check_output(
+        [sys.executable, '-c', PROBE.format(module=module)], cwd=ROOT)
+    elapsed, rss, tkinter, numpy = output.split()
+    return float(elapsed), int(rss), tkinter == b'True', numpy == b'True'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    print("{:>10} {:>12} {:>12} {:>8} {:>6}".format(
+        "module", "import(ms)", "maxrss(KiB)", "tkinter", "numpy"))
+    for module in MODULES:
+        runs = [probe(module) for _ in range(args.runs)]
+        print("{:>10} {:>12.2f} {:>12} {:>8} {:>6}".format(
+            module,
+            statistics.median(run[0] for run in runs) * 1000,
+            int(statistics.median(run[1] for run in runs)),
+            str(runs[0][2]), str(runs[0][3])))
+
+
+if __name__ == '__main__':
+    main()
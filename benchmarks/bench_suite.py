@@ -0,0 +1,167 @@
+#!/usr/local/bin/python3
+
+
+# Benchmark suite for the minimization pipeline. Every case is timed
+# stage by stage (combining rounds, exact cover, legacy cover, K-map
+# groups, wordify) and the results are written as JSON so that releases can be
+# compared.
+#
+# usage: python benchmarks/bench_suite.py [--output results.json] [--quick]
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from kmap_core import (ENGINES, Minterms, SimplifyStats, Term,  # noqa: E402
+                       kmap_groups, prime_implicants, remove_redundant_terms,
+                       remove_repeated_sources, to_bin, wordify, wordify_pos)
+from kmap_verify import check  # noqa: E402
+
+LEGACY_COVER_LIMIT = 400  # primes, the legacy cover is cubic
+
+
+def random_case(nov, density, dc_ratio, seed):
+    rng = random.Random(seed)
+    mt, dc = [], []
+    for m in range(2 ** nov):
+        r = rng.random()
+        if r < density:
+            mt.append(m)
+        elif r < density + dc_ratio:
+            dc.append(m)
+    name = "random-{}-d{}-dc{}-s{}".format(nov, density, dc_ratio, seed)
+    return name, nov, mt, dc
+
+
+def parity_case(nov):
+    mt = [m for m in range(2 ** nov) if bin(m).count('1') % 2]
+    return "parity-{}".format(nov), nov, mt, []
+
+
+def threshold_case(nov, k):
+    mt = [m for m in range(2 ** nov) if bin(m).count('1') >= k]
+    return "threshold-{}-{}".format(nov, k), nov, mt, []
+
+
+def cases(quick=False):
+    sizes = [4, 6, 8] if quick else [4, 6, 8, 10]
+    for nov in sizes:
+        for density in (0.25, 0.5):
+            for dc_ratio in (0.0, 0.1):
+                yield random_case(nov, density, dc_ratio, seed=nov)
+    for nov in ([4, 6, 8] if quick else [4, 6, 8, 10, 12]):
+        yield parity_case(nov)
+    for nov in ([4, 6] if quick else [4, 6, 8]):
+        yield threshold_case(nov, nov // 2)
+
+
+def make_minterms(nov, mt, dc):
+    return Minterms([Term(to_bin(m, nov)) for m in mt],
+                    not_cares=[Term(to_bin(m, nov)) for m in dc], nov=nov)
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def run_case(name, nov, mt, dc, engine, time_budget, memory):
+    record = {'name': name, 'variables': nov, 'minterms': len(mt),
+              'not_cares': len(dc), 'times': {}}
+    times = record['times']
+
+    minterms = make_minterms(nov, mt, dc)
+    terms = minterms.not_cares + minterms.minterms
+    for idx, term in enumerate(terms):
+        term.source = [idx]
+    stats = SimplifyStats()
+    stats.start_function()
+    primes, times['combine'] = timed(prime_implicants, terms, engine, stats)
+    record['rounds'] = stats.rounds
+    record['primes'] = len(primes)
+
+    result, times['cover'] = timed(minterms._select_cover, primes, time_budget)
+    record['cover_terms'] = len(result)
+    record['cover_literals'] = sum(nov - str(term).count('*') for term in result)
+    record['is_minimal'] = minterms.is_minimal
+
+    if len(primes) <= LEGACY_COVER_LIMIT:
+        start = time.perf_counter()
+        legacy = remove_repeated_sources(primes, primes)
+        legacy = remove_redundant_terms(legacy, minterms.not_cares)
+        times['legacy_cover'] = time.perf_counter() - start
+        record['legacy_cover_terms'] = len(legacy)
+
+    _, times['wordify'] = timed(wordify, result, None, nov)
+
+    _, times['groups'] = timed(kmap_groups, result)
+
+    times['total'] = sum(t for t in times.values() if t is not None)
+
+    if memory:
+        tracemalloc.start()
+        make_minterms(nov, mt, dc).simplify(engine, time_budget=time_budget)
+        record['peak_memory'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return record
+
+
+def check_incremental():
+    """ Edits after a later simplify must start from its result, and the
+    result must always be in the form that form names. """
+    def words(minterms):
+        words = wordify_pos if minterms.form == 'pos' else wordify
+        return words(minterms.result, None, 4) or '1'
+
+    mt = [1, 3, 5, 7]
+    minterms = make_minterms(4, mt, [])
+    minterms.simplify()
+    for m, form in ((8, 'pos'), (9, 'sop'), (10, None)):
+        minterms.add_minterm(Term(to_bin(m, 4)))
+        mt.append(m)
+        check(words(minterms), mt, [], 4)
+        if form is not None:
+            minterms.simplify(form=form)
+            check(words(minterms), mt, [], 4)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--output', default='-', help="JSON file, stdout by default")
+    parser.add_argument('--engine', default='bucketed', choices=ENGINES)
+    parser.add_argument('--time-budget', type=float, default=10.0,
+                        help="seconds for the cover search of each case")
+    parser.add_argument('--quick', action='store_true', help="smaller cases only")
+    parser.add_argument('--no-memory', action='store_true',
+                        help="skip the tracemalloc pass measuring peak memory")
+    args = parser.parse_args(argv)
+
+    check_incremental()
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'engine': args.engine,
+        'time_budget': args.time_budget,
+        'cases': [run_case(name, nov, mt, dc, args.engine, args.time_budget,
+                           not args.no_memory)
+                  for name, nov, mt, dc in cases(args.quick)],
+    }
+
+    if args.output == '-':
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    else:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
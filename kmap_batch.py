@@ -0,0 +1,85 @@
+#!/usr/local/bin/python3
+
+
+# Batch minimization of many functions over a process pool
+# Author: Anuj Gautam
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import itertools
+import os
+
+from kmap_core import SimplifyStats, minimize
+
+
+def _chunks(jobs, chunksize):
+    jobs = iter(jobs)
+    while True:
+        chunk = list(itertools.islice(jobs, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _minimize_chunk(chunk, options, collect_stats, verify=False):
+    stats = SimplifyStats() if collect_stats else None
+    results = [minimize(mt, dc, nov, stats=stats, **options) for mt, dc, nov in chunk]
+    if verify:
+        from kmap_verify import check
+        for (mt, dc, nov), result in zip(chunk, results):
+            check(result, mt, dc, nov)
+    return results, stats.as_dict() if collect_stats else None
+
+
+def minimize_batch(jobs, workers=None, chunksize=16, ordered=True, stats=None,
+                   verify=False, **options):
+    """ Minimize every (minterms, not_cares, nov) job on a process pool.
+
+    Jobs are read lazily and only a few chunks per worker are in flight,
+    so jobs can be a generator of any length. With ordered=True the SOPs
+    are yielded in job order, otherwise (index, SOP) pairs are yielded as
+    soon as their chunk is done. The options go to Minterms.simplify, and
+    the SimplifyStats of the workers are added to stats when one is given.
+    With verify=True every result is checked against its function in the
+    worker, see kmap_verify.check, and a wrong one raises ValueError.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1 or chunksize < 1:
+        raise ValueError("workers and chunksize must be at least 1")
+    max_pending = 2 * workers
+    collect_stats = stats is not None
+    chunks = enumerate(_chunks(jobs, chunksize))
+
+    with ProcessPoolExecutor(workers) as pool:
+        if ordered:
+            pending = deque()
+            for _, chunk in chunks:
+                if len(pending) >= max_pending:
+                    for result in _collect(pending.popleft(), stats):
+                        yield result
+                pending.append(pool.submit(_minimize_chunk, chunk, options, collect_stats, verify))
+            while pending:
+                for result in _collect(pending.popleft(), stats):
+                    yield result
+        else:
+            pending = {}
+            for n, chunk in chunks:
+                if len(pending) >= max_pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        for item in enumerate(_collect(future, stats), pending.pop(future)):
+                            yield item
+                pending[pool.submit(_minimize_chunk, chunk, options, collect_stats, verify)] = n * chunksize
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    for item in enumerate(_collect(future, stats), pending.pop(future)):
+                        yield item
+
+
+def _collect(future, stats):
+    results, chunk_stats = future.result()
+    if stats is not None:
+        stats.update(chunk_stats)
+    return results
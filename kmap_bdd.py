@@ -0,0 +1,311 @@
+#!/usr/local/bin/python3
+
+
+# Reduced ordered BDDs, for functions whose truth tables or minterm lists
+# don't fit in memory.
+#
+# A node is an int, 0 and 1 are the constants. Variable i is character i
+# of a Term (the most significant bit of a minterm number comes first) and
+# is tested at level i. Nodes are kept unique through a table keyed by
+# (variable, low, high), results of operations are kept in a computed
+# table, and nodes not reachable from a referenced node are collected.
+# Author: Anuj Gautam
+
+from bisect import bisect_left
+
+from kmap_core import Implicant, Term, _to_cube, wordify
+
+
+class BDD(object):
+    """ BDD stores the nodes of functions of nov variables.
+
+    Operations may collect garbage before they start, a node kept across
+    later operations must be protected with ref() and released with deref().
+    """
+
+    FALSE = 0
+    TRUE = 1
+
+    def __init__(self, nov, gc_threshold=1 << 16):
+        self.nov = nov
+        self._var = [nov, nov]  # constants sit below the last level
+        self._low = [0, 1]
+        self._high = [0, 1]
+        self._refs = [1, 1]
+        self._free = []
+        self._unique = {}
+        self._computed = {}
+        self.gc_threshold = gc_threshold
+        self.collections = 0
+
+    def __len__(self):
+        """ Number of live nodes, the constants included. """
+        return len(self._var) - len(self._free)
+
+    def _mk(self, var, low, high):
+        if low == high:
+            return low
+        key = (var, low, high)
+        node = self._unique.get(key)
+        if node is None:
+            if self._free:
+                node = self._free.pop()
+                self._var[node], self._low[node], self._high[node] = key
+                self._refs[node] = 0
+            else:
+                node = len(self._var)
+                self._var.append(var)
+                self._low.append(low)
+                self._high.append(high)
+                self._refs.append(0)
+            self._unique[key] = node
+        return node
+
+    def ref(self, node):
+        self._refs[node] += 1
+        return node
+
+    def deref(self, node):
+        if self._refs[node] < 1:
+            raise ValueError("node {} is not referenced".format(node))
+        self._refs[node] -= 1
+
+    def collect(self, *roots):
+        """ Free the nodes not reachable from referenced nodes or roots. """
+        marked = set([0, 1])
+        stack = [node for node, refs in enumerate(self._refs) if refs > 0]
+        stack.extend(roots)
+        while stack:
+            node = stack.pop()
+            if node not in marked:
+                marked.add(node)
+                stack.append(self._low[node])
+                stack.append(self._high[node])
+
+        free = set(self._free)
+        for node in range(2, len(self._var)):
+            if node not in marked and node not in free:
+                del self._unique[(self._var[node], self._low[node], self._high[node])]
+                self._var[node] = -1
+                self._free.append(node)
+        self._computed.clear()
+        self.collections += 1
+
+    def _maybe_collect(self, *roots):
+        if len(self) > self.gc_threshold:
+            self.collect(*roots)
+            # keep the collections rare when most nodes are alive
+            if len(self) > self.gc_threshold // 2:
+                self.gc_threshold *= 2
+
+    # building
+
+    def variable(self, i, value=True):
+        """ Node of variable i, or of its complement. """
+        return self._mk(i, 0, 1) if value else self._mk(i, 1, 0)
+
+    def cube(self, term):
+        """ Node of a Term, an Implicant or a string like '1-0*'. """
+        if isinstance(term, str):
+            term = Term(term.replace('-', '*'))
+        if term.length != self.nov:
+            raise ValueError("Expected {} variables, got {}".format(self.nov, term))
+        value, mask = _to_cube(term)
+        node = 1
+        for i in reversed(range(self.nov)):
+            bit = 1 << (self.nov - 1 - i)
+            if mask & bit:
+                node = self._mk(i, 0, node) if value & bit else self._mk(i, node, 0)
+        return node
+
+    def from_cubes(self, terms):
+        """ Node of the OR of cubes, combined as a balanced tree. """
+        nodes = [self.cube(term) for term in terms]
+        if not nodes:
+            return 0
+        while len(nodes) > 1:
+            self._maybe_collect(*nodes)
+            nodes = [self._apply('or', nodes[i], nodes[i + 1]) if i + 1 < len(nodes)
+                     else nodes[i] for i in range(0, len(nodes), 2)]
+        return nodes[0]
+
+    def from_minterms(self, mt):
+        """ Node of the function with the minterm numbers mt. """
+        mt = sorted(set(mt))
+        if mt and (mt[0] < 0 or mt[-1] >= 1 << self.nov):
+            raise ValueError("minterms must be below 2 ** {}".format(self.nov))
+        return self._from_sorted(mt, 0, len(mt), 0)
+
+    def _from_sorted(self, mt, lo, hi, level):
+        # the minterms mt[lo:hi] share their first level bits
+        if lo == hi:
+            return 0
+        if hi - lo == 1 << (self.nov - level):
+            return 1
+        bit = 1 << (self.nov - 1 - level)
+        split = bisect_left(mt, (mt[lo] & ~(2 * bit - 1)) | bit, lo, hi)
+        return self._mk(level, self._from_sorted(mt, lo, split, level + 1),
+                        self._from_sorted(mt, split, hi, level + 1))
+
+    def from_pla(self, pla, output=0):
+        """ (ON node, "don't care" node) of an output of a kmap_pla.Pla. """
+        if pla.inputs != self.nov:
+            raise ValueError("Expected {} inputs, the PLA has {}".format(self.nov, pla.inputs))
+        on = self.ref(self.from_cubes(pla.on[output]))
+        not_care = self.from_cubes(pla.not_cares(output))
+        self.deref(on)
+        return on, not_care
+
+    # operations
+
+    def and_(self, u, v):
+        self._maybe_collect(u, v)
+        return self._apply('and', u, v)
+
+    def or_(self, u, v):
+        self._maybe_collect(u, v)
+        return self._apply('or', u, v)
+
+    def xor(self, u, v):
+        self._maybe_collect(u, v)
+        return self._apply('xor', u, v)
+
+    def not_(self, u):
+        self._maybe_collect(u)
+        return self._not(u)
+
+    def _not(self, u):
+        if u < 2:
+            return 1 - u
+        key = ('not', u)
+        result = self._computed.get(key)
+        if result is None:
+            result = self._mk(self._var[u], self._not(self._low[u]), self._not(self._high[u]))
+            self._computed[key] = result
+        return result
+
+    def _apply(self, op, u, v):
+        if op == 'and':
+            if u == 0 or v == 0:
+                return 0
+            if u == 1 or u == v:
+                return v
+            if v == 1:
+                return u
+        elif op == 'or':
+            if u == 1 or v == 1:
+                return 1
+            if u == 0 or u == v:
+                return v
+            if v == 0:
+                return u
+        else:
+            if u == v:
+                return 0
+            if u == 0:
+                return v
+            if v == 0:
+                return u
+            if u == 1:
+                return self._not(v)
+            if v == 1:
+                return self._not(u)
+
+        if u > v:
+            u, v = v, u  # all three operations commute
+        key = (op, u, v)
+        result = self._computed.get(key)
+        if result is None:
+            var = min(self._var[u], self._var[v])
+            u0, u1 = self._cofactors(u, var)
+            v0, v1 = self._cofactors(v, var)
+            result = self._mk(var, self._apply(op, u0, v0), self._apply(op, u1, v1))
+            self._computed[key] = result
+        return result
+
+    def _cofactors(self, u, var):
+        if self._var[u] == var:
+            return self._low[u], self._high[u]
+        return u, u
+
+    # queries
+
+    def evaluate(self, u, m):
+        """ Value of the function u on minterm number m. """
+        while u > 1:
+            u = self._high[u] if m >> (self.nov - 1 - self._var[u]) & 1 else self._low[u]
+        return u
+
+    def count(self, u):
+        """ Number of minterms of the function u. """
+        counts = {0: 0, 1: 1}
+
+        def visit(node):
+            if node not in counts:
+                var = self._var[node]
+                low, high = self._low[node], self._high[node]
+                counts[node] = (visit(low) << (self._var[low] - var - 1)) + \
+                    (visit(high) << (self._var[high] - var - 1))
+            return counts[node]
+
+        return visit(u) << self._var[u] if u > 1 else u << self.nov
+
+    # Minato-Morreale irredundant sum of products
+
+    def isop(self, lower, upper=None):
+        """ Irredundant cover of any function between lower and upper.
+
+        upper is lower when it is not given, lower OR the "don't cares"
+        otherwise. Returns the cover as a list of Implicants.
+        """
+        if upper is None:
+            upper = lower
+        if self._apply('and', lower, self._not(upper)) != 0:
+            raise ValueError("lower must imply upper")
+        cubes, _ = self._isop(lower, upper, {})
+        return [Implicant(value, mask, self.nov) for value, mask in cubes]
+
+    def _isop(self, lower, upper, memo):
+        if lower == 0:
+            return [], 0
+        if upper == 1:
+            return [(0, 0)], 1
+        key = (lower, upper)
+        if key in memo:
+            return memo[key]
+
+        var = min(self._var[lower], self._var[upper])
+        bit = 1 << (self.nov - 1 - var)
+        l0, l1 = self._cofactors(lower, var)
+        u0, u1 = self._cofactors(upper, var)
+
+        # the 1s that need the literal var' or var, then the ones that don't
+        c0, f0 = self._isop(self._apply('and', l0, self._not(u1)), u0, memo)
+        c1, f1 = self._isop(self._apply('and', l1, self._not(u0)), u1, memo)
+        rest = self._apply('or', self._apply('and', l0, self._not(f0)),
+                           self._apply('and', l1, self._not(f1)))
+        cs, fs = self._isop(rest, self._apply('and', u0, u1), memo)
+
+        cubes = ([(value, mask | bit) for value, mask in c0]
+                 + [(value | bit, mask | bit) for value, mask in c1] + cs)
+        cover = self._mk(var, self._apply('or', f0, fs), self._apply('or', f1, fs))
+        memo[key] = cubes, cover
+        return cubes, cover
+
+
+def minimize_isop(on, dc=(), nov=None):
+    """ SOP of the function given by ON and "don't care" cubes, built as a
+    BDD and covered by its ISOP, for widths where minterms don't fit.
+
+    The cubes are Terms, Implicants or strings like '1--0'. The result is
+    irredundant but not always minimal. Returns the same strings as minimize.
+    """
+    on, dc = list(on), list(dc)
+    if not on:
+        return '0'
+    if not nov:
+        nov = len(on[0]) if isinstance(on[0], str) else on[0].length
+    bdd = BDD(nov)
+    lower = bdd.ref(bdd.from_cubes(on))
+    upper = bdd.or_(lower, bdd.from_cubes(dc))
+    return wordify(bdd.isop(lower, upper), None, nov) or '1'
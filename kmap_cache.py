@@ -0,0 +1,134 @@
+#!/usr/local/bin/python3
+
+
+# Memoized minimization, results are keyed by the truth table of the
+# function so that any ordering of the same minterms and "don't cares"
+# hits the same entry.
+# Author: Anuj Gautam
+
+from collections import OrderedDict
+import sqlite3
+
+from kmap_core import _minimize
+
+
+def truth_table_key(mt, dc=(), nov=None):
+    """ Canonical (ON-set bits, DC-set bits, nov) key of a function. """
+    on = 0
+    for m in mt:
+        on |= 1 << m
+    not_care = 0
+    for m in dc:
+        not_care |= 1 << m
+    return on, not_care & ~on, nov
+
+
+class MinimizeCache(object):
+    """ Bounded LRU cache in front of kmap_core.minimize.
+
+    With a path, results are also kept in a sqlite file and looked up
+    there when they are not in memory, so they survive across runs.
+    """
+
+    def __init__(self, maxsize=4096, path=None, commit_every=256):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.db = None
+        self.commit_every = commit_every
+        self._uncommitted = 0
+        if path is not None:
+            self.db = sqlite3.connect(path)
+            self.db.execute("CREATE TABLE IF NOT EXISTS results "
+                            "(key TEXT PRIMARY KEY, sop TEXT NOT NULL)")
+
+    @staticmethod
+    def _db_key(key):
+        if len(key) == 4:
+            on, not_care, nov, form = key
+            return "{}:{}:{:x}:{:x}".format(form, nov or '', on, not_care)
+        on, not_care, nov = key
+        return "{}:{:x}:{:x}".format(nov or '', on, not_care)
+
+    def get(self, key):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        if self.db is not None:
+            row = self.db.execute("SELECT sop FROM results WHERE key = ?",
+                                  (self._db_key(key),)).fetchone()
+            if row is not None:
+                self.disk_hits += 1
+                self._remember(key, row[0])
+                return row[0]
+        self.misses += 1
+        return None
+
+    def put(self, key, sop):
+        self._remember(key, sop)
+        if self.db is not None:
+            self.db.execute("INSERT OR REPLACE INTO results VALUES (?, ?)",
+                            (self._db_key(key), sop))
+            self._uncommitted += 1
+            if self._uncommitted >= self.commit_every:
+                self.commit()
+
+    def _remember(self, key, sop):
+        self.entries[key] = sop
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def minimize(self, mt, dc=(), nov=None, **options):
+        """ Same as kmap_core.minimize, answered from the cache when possible.
+        The legacy cover is not minimal, its results are never cached. """
+        if options.get('cover', 'exact') != 'exact':
+            return _minimize(mt, dc, nov, **options)[0]
+        key = truth_table_key(mt, dc, nov)
+        form = options.get('form', 'sop')
+        if form != 'sop':
+            key += (form,)
+        sop = self.get(key)
+        if sop is None:
+            sop, budget_hit = _minimize(mt, dc, nov, **options)
+            # a result cut short by a budget is not what a later run
+            # without one would get, it is returned but not kept
+            if budget_hit is None:
+                self.put(key, sop)
+        return sop
+
+    def stats(self):
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self.entries),
+            'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+        }
+
+    def commit(self):
+        if self.db is not None:
+            self.db.commit()
+            self._uncommitted = 0
+
+    def close(self):
+        if self.db is not None:
+            self.commit()
+            self.db.close()
+            self.db = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
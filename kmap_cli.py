@@ -0,0 +1,161 @@
+#!/usr/local/bin/python3
+
+
+# Headless Karnaugh map minimizer, reads one function per line and
+# writes its minimized SOP on the matching output line.
+#
+# A line holds the minterms and the "don't cares" separated by '/',
+# the same fields the GUI asks for:
+#     0 1 2 5 6 7 8 9 10 14
+#     1 3 7 11 15 / 0 2 5
+# Blank lines and lines starting with '#' are skipped.
+#
+# usage: python kmap_cli.py [file] [--nov 4] [--workers 1]
+# Author: Anuj Gautam
+
+import argparse
+import json
+import sys
+
+from kmap_core import ENGINES, SimplifyStats, minimize
+
+
+def parse_function(line):
+    """ Split a "minterms / don't cares" line into two lists of ints. """
+    fields = line.split('/')
+    if len(fields) > 2:
+        raise ValueError("expected 'minterms / don't cares', got {!r}".format(line))
+    mt = [int(i) for i in fields[0].split()]
+    dc = [int(i) for i in fields[1].split()] if len(fields) == 2 else []
+    return mt, dc
+
+
+def read_functions(lines, nov=None):
+    """ Yield a (minterms, not_cares, nov) job for every function line. """
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        try:
+            mt, dc = parse_function(line)
+        except ValueError as error:
+            raise ValueError("line {}: {}".format(number, error))
+        yield mt, dc, nov
+
+
+def minimize_functions(jobs, workers=1, chunksize=64, cache=None, verify=False, **options):
+    """ Yield the SOP of every job, in order. A cache can't be used with
+    workers. With verify, a result that differs from its function raises
+    ValueError. """
+    if workers > 1:
+        if cache is not None:
+            raise ValueError("a cache can't be shared with workers")
+        from kmap_batch import minimize_batch
+        return minimize_batch(jobs, workers, chunksize, verify=verify, **options)
+    solve = cache.minimize if cache is not None else minimize
+    if verify:
+        return _verified(solve, jobs, options)
+    return (solve(mt, dc, nov, **options) for mt, dc, nov in jobs)
+
+
+def _verified(solve, jobs, options):
+    from kmap_verify import check
+    for mt, dc, nov in jobs:
+        result = solve(mt, dc, nov, **options)
+        check(result, mt, dc, nov)
+        yield result
+
+
+def write_stats(path, stats, cache=None):
+    report = stats.as_dict()
+    if cache is not None:
+        report['cache'] = cache.stats()
+    if path == '-':
+        json.dump(report, sys.stderr, indent=2)
+        sys.stderr.write('\n')
+    else:
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='kmap_cli', description="Minimize one function per line.")
+    parser.add_argument('input', nargs='?', default='-',
+                        help="file to read, '-' or nothing for stdin")
+    parser.add_argument('--nov', type=int, default=None,
+                        help="number of variables, from the largest term by default")
+    parser.add_argument('--engine', default='bucketed',
+                        choices=ENGINES,
+                        help="'parallel' splits each function over --workers processes "
+                             "instead of running several functions at once")
+    parser.add_argument('--form', default='sop', choices=['sop', 'pos', 'auto'],
+                        help="sum of products, product of sums, or the one with fewer literals")
+    parser.add_argument('--time-budget', type=float, default=None,
+                        help="seconds for each function, past them the best cover "
+                             "found so far is written")
+    parser.add_argument('--max-implicants', type=int, default=None,
+                        help="stop combining a function past this many implicants in a round")
+    parser.add_argument('--max-memory', type=float, default=None, metavar='MB',
+                        help="stop combining a function past this many megabytes in a round")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="processes minimizing functions at once")
+    parser.add_argument('--chunksize', type=int, default=64)
+    parser.add_argument('--cache-size', type=int, default=0,
+                        help="keep this many results for repeated functions")
+    parser.add_argument('--cache-file', default=None,
+                        help="sqlite file keeping cached results across runs")
+    parser.add_argument('--npn', action='store_true',
+                        help="share cached results between NPN equivalent functions")
+    parser.add_argument('--verify', action='store_true',
+                        help="check every result against its function")
+    parser.add_argument('--stats', default=None, metavar='FILE',
+                        help="write minimization statistics as JSON, '-' for stderr")
+    args = parser.parse_args(argv)
+    if args.workers > 1 and args.engine != 'parallel' and (
+            args.cache_size or args.cache_file or args.npn):
+        # the workers have no access to the cache of this process
+        parser.error("--cache-size, --cache-file and --npn need --workers 1 "
+                     "or --engine parallel")
+
+    cache = None
+    if args.npn:
+        from kmap_npn import NPNCache
+        cache = NPNCache(args.cache_size or 4096, args.cache_file)
+    elif args.cache_size or args.cache_file:
+        from kmap_cache import MinimizeCache
+        cache = MinimizeCache(args.cache_size or 4096, args.cache_file)
+
+    max_memory = None
+    if args.max_memory is not None:
+        max_memory = int(args.max_memory * 2 ** 20)
+
+    stream = sys.stdin if args.input == '-' else open(args.input)
+    try:
+        jobs = read_functions(stream, args.nov)
+        stats = SimplifyStats() if args.stats else None
+        workers, options = args.workers, {}
+        if args.engine == 'parallel':
+            workers, options['processes'] = 1, args.workers
+        results = minimize_functions(jobs, workers, args.chunksize, cache, args.verify,
+                                     engine=args.engine, form=args.form,
+                                     time_budget=args.time_budget,
+                                     max_implicants=args.max_implicants,
+                                     max_memory=max_memory, stats=stats, **options)
+        for result in results:
+            sys.stdout.write(result + '\n')
+        if stats is not None:
+            write_stats(args.stats, stats, cache)
+    except ValueError as error:
+        sys.stderr.write("kmap_cli: {}\n".format(error))
+        return 1
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+        if cache is not None:
+            cache.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
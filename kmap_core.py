@@ -0,0 +1,2046 @@
+#!/usr/local/bin/python3
+
+
+# Quine McCluskey algorithm for minimizing logical expressions,
+# the engine behind the K-map GUI in kmap_v4.py. It has no GUI imports
+# and only loads numpy for the numpy engine.
+# Author: Anuj Gautam
+
+import heapq
+import itertools
+import os
+import sys
+import time
+
+
+class Term():
+    def __init__(self, term='', source=None, flag=False):
+        if source is None:
+            source = []
+        self.term = term
+        self.source = source
+        self.flag = flag
+        self.length = len(term)
+
+    def __eq__(self, other):
+        return self.term == other.term
+
+    def __str__(self):
+        return self.term
+
+    def __hash__(self):
+        return hash(self.term)
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class Implicant(object):
+    """ Implicant stores a term as two integers, its value and its care-mask.
+
+    Bit ``length - 1 - i`` of the integers is character ``i`` of the
+    equivalent Term, a cleared mask bit is a '*'.
+    """
+
+    __slots__ = ('value', 'mask', 'length', 'source', 'flag')
+
+    def __init__(self, value=0, mask=None, length=0, source=None, flag=False):
+        if mask is None:
+            mask = (1 << length) - 1
+        if source is None:
+            source = []
+        self.value = value & mask
+        self.mask = mask
+        self.length = length
+        self.source = source
+        self.flag = flag
+
+    @classmethod
+    def from_term(cls, term, source=None):
+        """ Build an Implicant from a Term or from a string like '01*1'. """
+        if isinstance(term, Term):
+            if source is None:
+                source = term.source
+            term = term.term
+        value = int(term.replace('*', '0') or '0', 2)
+        mask = int(term.replace('0', '1').replace('*', '0') or '0', 2)
+        return cls(value, mask, len(term), source)
+
+    @classmethod
+    def from_minterm(cls, minterm, nov, source=None):
+        return cls(minterm, None, nov, source)
+
+    @property
+    def term(self):
+        chars = []
+        for i in range(self.length - 1, -1, -1):
+            if not self.mask >> i & 1:
+                chars.append('*')
+            elif self.value >> i & 1:
+                chars.append('1')
+            else:
+                chars.append('0')
+        return ''.join(chars)
+
+    def to_term(self):
+        return Term(self.term, self.source, self.flag)
+
+    def __eq__(self, other):
+        if isinstance(other, Implicant):
+            return (self.value == other.value and self.mask == other.mask
+                    and self.length == other.length)
+        return self.term == other.term
+
+    def __str__(self):
+        return self.term
+
+    def __hash__(self):
+        return hash((self.value, self.mask, self.length))
+
+    def __repr__(self):
+        return self.__str__()
+
+
+def diff_terms(term1, term2):
+    if term1.length == term2.length:
+        diff = 0
+        pos = -1
+
+        for idx, (t1, t2) in enumerate(zip(term1.term, term2.term)):
+            if diff > 2:
+                break
+            else:
+                if t1 != t2:
+                    diff += 1
+                    pos = idx
+
+        if diff == 1:
+            new_term = '*'.join((term1.term[:pos], term2.term[pos + 1:]))
+            new_source = term1.source + term2.source
+            term1.flag = True
+            term2.flag = True
+
+            return Term(new_term, new_source)
+
+
+# Implicant version of diff_terms, the masks have to match
+# and the values have to differ in exactly one bit
+def diff_implicants(term1, term2):
+    if term1.mask == term2.mask and term1.length == term2.length:
+        diff = term1.value ^ term2.value
+        if diff and not diff & (diff - 1):
+            term1.flag = True
+            term2.flag = True
+
+            return Implicant(term1.value & ~diff, term1.mask & ~diff,
+                             term1.length, term1.source + term2.source)
+
+
+def get_not_simplified_terms(terms):
+    not_simplified_terms = []
+    for term in terms:
+        if not term.flag:
+            not_simplified_terms.append(term)
+
+    return not_simplified_terms
+
+
+# compare every pair of terms, the original way of combining. The combine
+# functions return None when the time of budget runs out inside the round
+def combine_terms_pairwise(terms, stats=None, budget=None):
+    diff = diff_implicants if _are_implicants(terms) else diff_terms
+    new_terms = []
+    for n, (term1, term2) in enumerate(itertools.combinations(terms, 2)):
+        if budget is not None and not n & 4095 and budget.timed_out():
+            return None
+        term = diff(term1, term2)
+        if term:
+            new_terms.append(term)
+
+    if stats is not None:
+        stats.comparisons += len(terms) * (len(terms) - 1) // 2
+    return new_terms
+
+
+_DASH_MASK = str.maketrans('01', '--')
+
+
+# group terms by the position of their dashes and by their number of 1s,
+# only terms in neighbouring groups with the same dashes can be combined
+def combine_terms_bucketed(terms, stats=None, budget=None):
+    if _are_implicants(terms):
+        return combine_implicants_bucketed(terms, stats, budget)
+
+    buckets = {}
+    for term in terms:
+        key = (term.term.translate(_DASH_MASK), term.term.count('1'))
+        buckets.setdefault(key, []).append(term)
+
+    new_terms = []
+    comparisons = 0
+    for (mask, ones), lower in buckets.items():
+        upper = buckets.get((mask, ones + 1))
+        if not upper:
+            continue
+        comparisons += len(lower) * len(upper)
+        for n, (term1, term2) in enumerate(itertools.product(lower, upper)):
+            if budget is not None and not n & 4095 and budget.timed_out():
+                return None
+            term = diff_terms(term1, term2)
+            if term:
+                new_terms.append(term)
+
+    if stats is not None:
+        stats.comparisons += comparisons
+    return new_terms
+
+
+# same buckets for Implicants, but the partners of a term are looked up
+# by value instead of comparing it to the whole neighbouring bucket
+def combine_implicants_bucketed(terms, stats=None, budget=None):
+    buckets = {}
+    for term in terms:
+        key = (term.mask, bin(term.value).count('1'))
+        buckets.setdefault(key, {}).setdefault(term.value, []).append(term)
+
+    new_terms = []
+    lookups = 0
+    for (mask, ones), lower in buckets.items():
+        upper = buckets.get((mask, ones + 1))
+        if not upper:
+            continue
+        for n, (value, lower_terms) in enumerate(lower.items()):
+            if budget is not None and not n & 255 and budget.timed_out():
+                return None
+            free = mask & ~value
+            while free:
+                bit = free & -free
+                free ^= bit
+                lookups += 1
+                for term1, term2 in itertools.product(
+                        lower_terms, upper.get(value | bit, ())):
+                    new_terms.append(diff_implicants(term1, term2))
+
+    if stats is not None:
+        stats.comparisons += lookups
+    return new_terms
+
+
+def _are_implicants(terms):
+    return bool(terms) and isinstance(terms[0], Implicant)
+
+
+COMBINE_ENGINES = {
+    'pairwise': combine_terms_pairwise,
+    'bucketed': combine_terms_bucketed,
+}
+
+# every engine of prime_implicants, the ones above work round by round
+ENGINES = ('pairwise', 'bucketed', 'numpy', 'consensus', 'parallel', 'streaming')
+
+
+# one combining round over the keys[lo:hi], their partners are searched
+# in all of keys. The keys that combined are set in used, returns the
+# combined keys, without repeats, and the number of combinations
+def _merge_keys(keys, used, lo, hi, nov):
+    import numpy as np
+
+    shift = np.uint64(nov)
+    part = keys[lo:hi]
+    values = part & np.uint64((1 << nov) - 1)
+    masks = part >> shift
+    new_keys = []
+    for b in range(nov):
+        bit = np.uint64(1 << b)
+        low = np.flatnonzero(((masks & bit) != 0) & ((values & bit) == 0))
+        partners = part[low] | bit
+        pos = np.searchsorted(keys, partners)
+        pos[pos == keys.size] = 0
+        found = keys[pos] == partners
+        used[low[found] + lo] = True
+        used[pos[found]] = True
+        # the combined term keeps the value of the lower term
+        # and drops the bit from its mask
+        new_keys.append(part[low[found]] & ~(bit << shift))
+    return np.unique(np.concatenate(new_keys)), sum(k.size for k in new_keys)
+
+
+# a round on a worker, the keys and the used flags after them are in
+# shared memory, so only the range and the new keys are passed around
+def _merge_shared(name, size, lo, hi, nov):
+    import numpy as np
+    from multiprocessing import shared_memory
+
+    shm = shared_memory.SharedMemory(name=name)
+    keys = used = None
+    try:
+        keys = np.ndarray((size,), dtype=np.uint64, buffer=shm.buf)
+        used = np.ndarray((size,), dtype=bool, buffer=shm.buf, offset=keys.nbytes)
+        return _merge_keys(keys, used, lo, hi, nov)
+    finally:
+        keys = used = None
+        shm.close()
+
+
+PARALLEL_MIN_KEYS = 1 << 14  # smaller rounds are not worth the round trip
+
+
+def _merge_round(keys, nov, pool=None, processes=1):
+    import numpy as np
+
+    if pool is None or keys.size < PARALLEL_MIN_KEYS:
+        used = np.zeros(keys.size, dtype=bool)
+        new_keys, merges = _merge_keys(keys, used, 0, keys.size, nov)
+        return new_keys, used, merges
+
+    from multiprocessing import shared_memory
+
+    # the keys are sorted by mask, then value, so every range covers a run
+    # of mask buckets, a few ranges per worker even out the bucket sizes
+    shm = shared_memory.SharedMemory(create=True, size=keys.nbytes + keys.size)
+    shared = shared_used = None
+    try:
+        shared = np.ndarray(keys.shape, dtype=np.uint64, buffer=shm.buf)
+        shared[:] = keys
+        shared_used = np.ndarray(keys.shape, dtype=bool, buffer=shm.buf, offset=keys.nbytes)
+        shared_used[:] = False
+        bounds = np.linspace(0, keys.size, 4 * processes + 1).astype(int).tolist()
+        futures = [pool.submit(_merge_shared, shm.name, keys.size, lo, hi, nov)
+                   for lo, hi in zip(bounds, bounds[1:]) if lo < hi]
+        results = [future.result() for future in futures]
+        used = shared_used.copy()
+    finally:
+        shared = shared_used = None
+        shm.close()
+        shm.unlink()
+    new_keys = np.unique(np.concatenate([new for new, _ in results]))
+    return new_keys, used, sum(merges for _, merges in results)
+
+
+# run all the combining rounds on uint64 arrays, every implicant is packed
+# into one key, its mask above its value, so that a sorted array of keys
+# can be searched for the partner of every term at once. With processes,
+# the large rounds are split over a process pool
+def prime_implicants_numpy(terms, stats=None, budget=None, processes=None):
+    import numpy as np
+
+    if not terms:
+        return []
+    nov = terms[0].length
+    if nov > 32:
+        raise ValueError("The numpy engine supports at most 32 variables")
+    if processes is not None and processes < 1:
+        raise ValueError("processes must be at least 1")
+
+    if _are_implicants(terms):
+        inputs = terms
+    else:
+        inputs = [Implicant.from_term(term) for term in terms]
+    in_values = np.array([term.value for term in inputs], dtype=np.uint64)
+    in_masks = np.array([term.mask for term in inputs], dtype=np.uint64)
+
+    shift = np.uint64(nov)
+    full = np.uint64((1 << nov) - 1)
+    keys = np.unique((in_masks << shift) | in_values)
+    pool = None
+    prime_keys = []
+    try:
+        while keys.size:
+            # the later rounds of a function are often far larger than its
+            # minterms, the pool starts with the first large round
+            if (pool is None and processes is not None and processes > 1
+                    and keys.size >= PARALLEL_MIN_KEYS):
+                from concurrent.futures import ProcessPoolExecutor
+                pool = ProcessPoolExecutor(processes)
+            new_keys, used, merges = _merge_round(keys, nov, pool, processes)
+            prime_keys.append(keys[~used])
+            if stats is not None:
+                stats.parallel_rounds += pool is not None and keys.size >= PARALLEL_MIN_KEYS
+                stats.comparisons += nov * keys.size
+                stats.add_round(keys.size, merges)
+            keys = new_keys
+            # a key with its terms and sources takes about as much as a Term
+            if budget is not None and keys.size and budget.check(keys.size, keys.size * 160):
+                prime_keys.append(keys)
+                break
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    primes = []
+    for key in np.concatenate(prime_keys).tolist():
+        value, mask = key & int(full), key >> nov
+        covered = np.flatnonzero(((in_masks & np.uint64(mask)) == mask)
+                                 & ((in_values & np.uint64(mask)) == value))
+        source = [idx for i in covered.tolist() for idx in inputs[i].source]
+        primes.append(Implicant(value, mask, nov, source))
+
+    if inputs is not terms:
+        primes = [term.to_term() for term in primes]
+    return primes
+
+
+# iterated consensus, the terms may be cubes of any size. Every pair of
+# cubes opposite in exactly one variable adds their consensus unless a cube
+# already contains it, and cubes contained in another one are dropped.
+# What is left once no pair adds a cube are the prime implicants
+def prime_implicants_consensus(terms, stats=None, budget=None):
+    if not terms:
+        return []
+    nov = terms[0].length
+    inputs = [_to_cube(term) for term in terms]
+
+    cubes = set()
+    for cube in sorted(set(inputs), key=lambda c: bin(c[1]).count('1')):
+        if not any(_cube_contains(other, cube) for other in cubes):
+            cubes.add(cube)
+    queue = list(cubes)
+    pairs = added = 0
+    while queue:
+        # every cube is an implicant, stopping early still leaves a cover
+        if budget is not None and budget.check(len(cubes), len(cubes) * 160):
+            break
+        cube = queue.pop()
+        if cube not in cubes:
+            continue  # contained in a later cube, which is in the queue
+        value, mask = cube
+        for other in list(cubes):
+            opposite = (value ^ other[0]) & mask & other[1]
+            pairs += 1
+            if not opposite or opposite & (opposite - 1):
+                continue
+            new_mask = (mask | other[1]) & ~opposite
+            new = ((value | other[0]) & new_mask, new_mask)
+            if any(_cube_contains(c, new) for c in cubes):
+                continue
+            cubes = set(c for c in cubes if not _cube_contains(new, c))
+            cubes.add(new)
+            queue.append(new)
+            added += 1
+            if cube not in cubes:
+                break
+
+    if stats is not None:
+        stats.comparisons += pairs
+        stats.add_round(len(inputs), added)
+
+    primes = []
+    for value, mask in cubes:
+        source = [idx for i, cube in enumerate(inputs) if _cube_contains((value, mask), cube)
+                  for idx in terms[i].source]
+        primes.append(Implicant(value, mask, nov, source))
+    if not _are_implicants(terms):
+        primes = [term.to_term() for term in primes]
+    return primes
+
+
+# one streaming round. rounds maps mask -> ones -> value -> source and is
+# emptied as it goes, a bucket is dropped as soon as it has been the lower
+# and the upper side of its pairs. The terms that didn't combine go to
+# primes, the combined ones are yielded as (value, mask, source). Once the
+# time of budget runs out no more pairs are looked up, the terms left are
+# all kept as they are, they still cover their minterms
+def _stream_round(buckets, primes, nov, counts, budget=None):
+    while buckets:
+        mask, levels = buckets.popitem()
+        used_upper = set()
+        for ones in sorted(levels):
+            lower = levels.pop(ones)
+            upper = levels.get(ones + 1)
+            used_lower, used_upper = used_upper, set()
+            if upper:
+                for n, (value, source) in enumerate(lower.items()):
+                    if budget is not None and not n & 255 and budget.timed_out():
+                        break
+                    free = mask & ~value
+                    while free:
+                        bit = free & -free
+                        free ^= bit
+                        counts[0] += 1
+                        partner = upper.get(value | bit)
+                        if partner is not None:
+                            used_lower.add(value)
+                            used_upper.add(value | bit)
+                            yield value, mask & ~bit, source + partner
+            for value, source in lower.items():
+                if value not in used_lower:
+                    primes.append(Implicant(value, mask, nov, source))
+
+
+def _add_stream_term(buckets, value, mask, source):
+    # keeps the first source of a repeated term, as set() does for Terms
+    bucket = buckets.setdefault(mask, {}).setdefault(bin(value).count('1'), {})
+    if value not in bucket:
+        bucket[value] = source
+        return True
+    return False
+
+
+# bucketed combining without a list of every round: the merged terms of a
+# round are streamed from a generator straight into the buckets of the next
+# one, as plain ints deduplicated by their value, and the buckets of the
+# round are released while it runs. Implicant objects are only made for
+# the primes
+def prime_implicants_streaming(terms, stats=None, budget=None):
+    if not terms:
+        return []
+    nov = terms[0].length
+    buckets = {}
+    size = 0
+    for term in terms:
+        value, mask = _to_cube(term)
+        size += _add_stream_term(buckets, value, mask, term.source)
+
+    primes = []
+    while buckets:
+        new_buckets = {}
+        counts = [0]
+        merges = new_size = sources = 0
+        for value, mask, source in _stream_round(buckets, primes, nov, counts, budget):
+            merges += 1
+            new_size += _add_stream_term(new_buckets, value, mask, source)
+            sources = len(source)
+        if stats is not None:
+            stats.comparisons += counts[0]
+            stats.add_round(size, merges)
+        buckets, size = new_buckets, new_size
+        # about an int key, its dict entry and its source list per term
+        if budget is not None and size and budget.check(size, size * (120 + 8 * sources)):
+            for mask, levels in buckets.items():
+                for bucket in levels.values():
+                    primes.extend(Implicant(value, mask, nov, source)
+                                  for value, source in bucket.items())
+            break
+
+    if not _are_implicants(terms):
+        primes = [term.to_term() for term in primes]
+    return primes
+
+
+# run the combining rounds until only prime implicants are left. With a
+# budget, the rounds stop once it is exceeded, the terms of the last round
+# and the primes found before it still cover every minterm. The parallel
+# engine is the numpy one on a pool of processes, one per core by default
+def prime_implicants(terms, engine='bucketed', stats=None, budget=None, processes=None):
+    if engine not in ENGINES:
+        raise ValueError("Unknown combining engine: {}".format(engine))
+    if engine == 'numpy':
+        return prime_implicants_numpy(terms, stats, budget)
+    if engine == 'parallel':
+        return prime_implicants_numpy(terms, stats, budget, processes or os.cpu_count() or 1)
+    if engine == 'consensus':
+        return prime_implicants_consensus(terms, stats, budget)
+    if engine == 'streaming':
+        return prime_implicants_streaming(terms, stats, budget)
+
+    combine = COMBINE_ENGINES[engine]
+
+    minterms_old = terms
+    no_new_term = False
+
+    # loop until no terms can be simplified
+    while not no_new_term:
+        # look into the terms that can be combined,
+        # and simplify them if they can be simplified
+        minterms_new = combine(minterms_old, stats, budget)
+        if minterms_new is None:
+            # stopped inside the round, its terms still cover every minterm
+            for term in minterms_old:
+                term.flag = False
+            break
+        no_new_term = not minterms_new
+        if stats is not None:
+            stats.add_round(len(minterms_old), len(minterms_new))
+
+        # add the terms that can't be simplified to new terms for next loop
+        minterms_new.extend(get_not_simplified_terms(minterms_old))
+
+        # remove the repeated terms
+        # and prepare for next loop
+        minterms_old = []
+        for term in set(minterms_new):
+            term.flag = False
+            minterms_old.append(term)
+        if (budget is not None and not no_new_term
+                and budget.check(len(minterms_old), _terms_bytes(minterms_old))):
+            break
+
+    return minterms_old
+
+
+# multi-output combining rounds, every cube carries a tag with one bit per
+# output whose 1s and "don't cares" contain the whole cube. Two neighbouring
+# cubes combine into a cube tagged with the outputs they share, and a cube
+# is only replaced when the combined cube keeps all of its outputs
+def multi_output_primes(points, nov, stats=None):
+    """ Prime implicants of several functions at once.
+
+    points maps every minterm value to its (tag, source) pair, returns
+    a list of (Implicant, tag) pairs.
+    """
+    full = (1 << nov) - 1
+    cubes = {(value, full): entry for value, entry in points.items()}
+    primes = []
+    while cubes:
+        by_mask = {}
+        for (value, mask), entry in cubes.items():
+            by_mask.setdefault(mask, {})[value] = entry
+
+        new_cubes = {}
+        replaced = set()
+        lookups = 0
+        for mask, level in by_mask.items():
+            for value, (tag, source) in level.items():
+                free = mask & ~value
+                while free:
+                    bit = free & -free
+                    free ^= bit
+                    lookups += 1
+                    partner = level.get(value | bit)
+                    if partner is None or not tag & partner[0]:
+                        continue
+                    shared = tag & partner[0]
+                    if shared == tag:
+                        replaced.add((value, mask))
+                    if shared == partner[0]:
+                        replaced.add((value | bit, mask))
+                    # the same cube is reached once per dash, any pair
+                    # gives its full source and tag
+                    key = (value, mask & ~bit)
+                    if key not in new_cubes:
+                        new_cubes[key] = (shared, source + partner[1])
+
+        for (value, mask), (tag, source) in cubes.items():
+            if (value, mask) not in replaced:
+                primes.append((Implicant(value, mask, nov, source), tag))
+        if stats is not None:
+            stats.comparisons += lookups
+            stats.add_round(len(cubes), len(new_cubes))
+        cubes = new_cubes
+
+    return primes
+
+
+# a copy of term with another source, as an Implicant or a Term when
+# implicant is given, of the type of term otherwise
+def _with_source(term, source, implicant=None):
+    if implicant is None:
+        implicant = isinstance(term, Implicant)
+    if isinstance(term, Implicant):
+        return Implicant(term.value, term.mask, term.length, source) if implicant \
+            else Term(term.term, source)
+    return Implicant.from_term(term.term, source) if implicant else Term(term.term, source)
+
+
+# remove source that appears in other terms' source list,
+# returns new terms and leaves the given ones untouched
+def remove_repeated_sources(terms, standard_terms):
+    # the first term holding each source, and the sources held by several terms
+    holders = {}
+    shared = set()
+    for term in standard_terms:
+        for idx in set(term.source):
+            holder = holders.setdefault(idx, term)
+            if holder != term:
+                shared.add(idx)
+
+    new_terms = []
+    for term in terms:
+        source = [idx for idx in term.source
+                  if idx not in shared and (idx not in holders or holders[idx] == term)]
+        new_terms.append(_with_source(term, source))
+    return new_terms
+
+
+# remove terms that its source list is empty
+# or its source list only contains indexes from "don't care"
+def remove_redundant_terms(terms, not_cares):
+    # don't cares come first, so their indexes are below len(not_cares)
+    number_of_not_cares = len(set(not_cares))
+    return [term for term in terms
+            if not (term.source and max(term.source) < number_of_not_cares)]
+
+
+class _Budget(object):
+    """ Limits of one minimization: seconds, implicants in a round and
+    estimated bytes of a round. exceeded names the first limit hit. """
+
+    def __init__(self, time_budget=None, max_implicants=None, max_memory=None):
+        self.deadline = None
+        if time_budget is not None:
+            self.deadline = time.perf_counter() + time_budget
+        self.max_implicants = max_implicants
+        self.max_memory = max_memory
+        self.exceeded = None
+
+    def remaining(self):
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.perf_counter())
+
+    def timed_out(self):
+        """ Whether the time is up, for checks inside a round. """
+        if (self.exceeded is None and self.deadline is not None
+                and time.perf_counter() > self.deadline):
+            self.exceeded = 'time'
+        return self.exceeded == 'time'
+
+    def check(self, implicants, nbytes=0):
+        """ Whether a round of implicants taking nbytes is over a limit. """
+        if self.exceeded is None:
+            if self.deadline is not None and time.perf_counter() > self.deadline:
+                self.exceeded = 'time'
+            elif self.max_implicants is not None and implicants > self.max_implicants:
+                self.exceeded = 'implicants'
+            elif self.max_memory is not None and nbytes > self.max_memory:
+                self.exceeded = 'memory'
+        return self.exceeded is not None
+
+
+def _terms_bytes(terms, sample=64):
+    # estimated from the first terms, their object, term and source list
+    if not terms:
+        return 0
+    size = 0
+    for term in terms[:sample]:
+        size += sys.getsizeof(term) + sys.getsizeof(term.source) + 8 * len(term.source)
+        size += sys.getsizeof(term.value) if isinstance(term, Implicant) else sys.getsizeof(term.term)
+    return size * len(terms) // min(len(terms), sample)
+
+
+class SimplifyStats(object):
+    """ Counters and timings filled in by Minterms.simplify.
+
+    Pass one to simplify (or to minimize) to collect them, one object can
+    gather many functions. Rounds are summed by index over the functions.
+    """
+
+    def __init__(self):
+        self.functions = 0
+        self.rounds = []
+        self.stages = {}
+        self.primes = 0
+        self.cover_terms = 0
+        self.non_minimal = 0
+        self.budget_hits = 0
+        self.parallel_rounds = 0  # rounds split over a process pool
+        self.comparisons = 0  # of the round in progress
+        self._round = 0
+
+    def start_function(self):
+        self.functions += 1
+        self._round = 0
+
+    def add_round(self, terms, merges):
+        if self._round == len(self.rounds):
+            self.rounds.append({'terms': 0, 'comparisons': 0, 'merges': 0})
+        counts = self.rounds[self._round]
+        counts['terms'] += terms
+        counts['comparisons'] += self.comparisons
+        counts['merges'] += merges
+        self.comparisons = 0
+        self._round += 1
+
+    def add_time(self, stage, start):
+        """ Add the time since start, from time.perf_counter, to stage. """
+        self.stages[stage] = self.stages.get(stage, 0.0) + time.perf_counter() - start
+
+    def as_dict(self):
+        return {
+            'functions': self.functions,
+            'rounds': [dict(counts) for counts in self.rounds],
+            'stages': dict(self.stages),
+            'primes': self.primes,
+            'cover_terms': self.cover_terms,
+            'non_minimal': self.non_minimal,
+            'budget_hits': self.budget_hits,
+            'parallel_rounds': self.parallel_rounds,
+        }
+
+    def update(self, other):
+        """ Add the counters of another SimplifyStats or of its as_dict. """
+        if isinstance(other, SimplifyStats):
+            other = other.as_dict()
+        self.functions += other['functions']
+        for i, counts in enumerate(other['rounds']):
+            if i == len(self.rounds):
+                self.rounds.append({'terms': 0, 'comparisons': 0, 'merges': 0})
+            for name, count in counts.items():
+                self.rounds[i][name] += count
+        for stage, seconds in other['stages'].items():
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+        self.primes += other['primes']
+        self.cover_terms += other['cover_terms']
+        self.non_minimal += other['non_minimal']
+        self.budget_hits += other.get('budget_hits', 0)
+        self.parallel_rounds += other.get('parallel_rounds', 0)
+
+
+def _bits(bitset):
+    while bitset:
+        bit = bitset & -bitset
+        yield bit
+        bitset ^= bit
+
+
+# greedy cover, used as the first upper bound of the branch and bound.
+# Every row keeps its count of uncovered columns, a pick only updates the
+# rows of the columns it covers, and the rows wait in a heap by cost per
+# column, a stale entry is pushed back with its new count when it comes up.
+# It is fast enough to always run to the end, past any deadline
+def _greedy_cover(rows, costs, candidates, uncovered):
+    counts = {}
+    column_rows = {}
+    for i in candidates:
+        row = rows[i] & uncovered
+        if row:
+            counts[i] = bin(row).count('1')
+            for bit in _bits(row):
+                column_rows.setdefault(bit, []).append(i)
+    heap = [(costs[i] / count, i, count) for i, count in counts.items()]
+    heapq.heapify(heap)
+
+    chosen = []
+    while uncovered and heap:
+        _, best, count = heapq.heappop(heap)
+        if counts[best] != count:
+            if counts[best]:
+                heapq.heappush(heap, (costs[best] / counts[best], best, counts[best]))
+            continue
+        chosen.append(best)
+        for bit in _bits(rows[best] & uncovered):
+            for i in column_rows[bit]:
+                counts[i] -= 1
+        uncovered &= ~rows[best]
+    return chosen
+
+
+class _CoverSearch(object):
+    """ Branch and bound over a bitset prime implicant chart.
+
+    Every row is an int whose bits are the columns (minterms) it covers.
+    Each node is reduced with essential rows, row dominance and column
+    dominance, split into independent blocks, and only then branches on
+    the column with the fewest rows.
+    """
+
+    def __init__(self, rows, costs, deadline):
+        self.rows = rows
+        self.costs = costs
+        self.deadline = deadline
+        self.minimal = True
+        self.essentials = None
+
+    def timed_out(self):
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            self.minimal = False
+        return not self.minimal
+
+    def greedy(self, candidates, uncovered):
+        chosen = _greedy_cover(self.rows, self.costs, candidates, uncovered)
+        return chosen, sum(self.costs[i] for i in chosen)
+
+    def _column_rows(self, candidates, uncovered):
+        column_rows = {}
+        for i in candidates:
+            for bit in _bits(self.rows[i] & uncovered):
+                column_rows[bit] = column_rows.get(bit, 0) | (1 << i)
+        return column_rows
+
+    def reduce(self, candidates, uncovered):
+        rows, costs = self.rows, self.costs
+        chosen, cost = [], 0
+        while True:
+            candidates = set(i for i in candidates if rows[i] & uncovered)
+            column_rows = self._column_rows(candidates, uncovered)
+            if len(column_rows) != bin(uncovered).count('1'):
+                return None  # a column can't be covered anymore
+
+            # essential rows
+            essential = set(r for r in column_rows.values() if not r & (r - 1))
+            if essential:
+                for r in essential:
+                    i = r.bit_length() - 1
+                    chosen.append(i)
+                    cost += costs[i]
+                    uncovered &= ~rows[i]
+                    candidates.discard(i)
+                continue
+
+            # past the deadline the dominance steps are skipped, what is
+            # reduced so far is still a valid chart
+            if self.timed_out():
+                return chosen, cost, candidates, uncovered, column_rows
+
+            # row dominance, drop a row covering a subset of a cheaper row,
+            # the rows covering every column of row i are the ANDed columns.
+            # Both dominance steps can stop halfway at the deadline, every
+            # row or column dropped by then has one left that dominates it
+            dominated = set()
+            for n, i in enumerate(candidates):
+                if not n % 64 and self.timed_out():
+                    break
+                others = ~(1 << i)
+                for bit in _bits(rows[i] & uncovered):
+                    others &= column_rows[bit]
+                    if not others:
+                        break
+                row_i = rows[i] & uncovered
+                for j in _bits(others):
+                    j = j.bit_length() - 1
+                    if (costs[j], j) < (costs[i], i) or (
+                            costs[j] == costs[i] and row_i != rows[j] & uncovered):
+                        dominated.add(i)
+                        break
+            if dominated:
+                candidates -= dominated
+                continue
+
+            # column dominance, drop a column whose rows contain the rows
+            # of another column, those columns are the ones no row outside
+            # of its rows covers
+            dropped = 0
+            for n, (bit, col) in enumerate(column_rows.items()):
+                if not n % 16 and self.timed_out():
+                    break
+                outside = 0
+                for i in candidates:
+                    if not col >> i & 1:
+                        outside |= rows[i]
+                inside = uncovered & ~outside & ~bit & ~dropped
+                for other in _bits(inside):
+                    if column_rows[other] != col or other < bit:
+                        dropped |= bit
+                        break
+            if dropped or self.timed_out():
+                uncovered &= ~dropped
+                continue
+
+            return chosen, cost, candidates, uncovered, column_rows
+
+    def blocks(self, candidates, uncovered):
+        # split the chart into groups of columns that share no row
+        blocks = []
+        while uncovered:
+            cols = uncovered & -uncovered
+            block_rows = set()
+            while True:
+                grown = cols
+                for i in candidates:
+                    if i not in block_rows and self.rows[i] & cols:
+                        block_rows.add(i)
+                        grown |= self.rows[i] & uncovered
+                if grown == cols:
+                    break
+                cols = grown
+            blocks.append((block_rows, cols))
+            uncovered &= ~cols
+        return blocks
+
+    def lower_bound(self, column_rows):
+        # columns with no row in common each need their own row
+        bound = 0
+        seen = 0
+        for col in sorted(column_rows.values(), key=lambda c: bin(c).count('1')):
+            if not col & seen:
+                seen |= col
+                bound += min(self.costs[i.bit_length() - 1] for i in _bits(col))
+        return bound
+
+    def solve(self, candidates, uncovered, upper):
+        """ Cheapest cover costing less than upper, as (rows, cost), or None.
+        Past the deadline it is None, the caller keeps the cover it has. """
+        if self.timed_out():
+            return None
+
+        reduced = self.reduce(candidates, uncovered)
+        if reduced is None:
+            return None
+        chosen, cost, candidates, uncovered, column_rows = reduced
+        if self.essentials is None:
+            self.essentials = list(chosen)
+
+        if not uncovered:
+            return (chosen, cost) if cost < upper else None
+        if cost + self.lower_bound(column_rows) >= upper:
+            return None
+
+        blocks = self.blocks(candidates, uncovered)
+        if len(blocks) > 1:
+            bounds = [self.lower_bound(self._column_rows(rows, cols))
+                      for rows, cols in blocks]
+            for n, (rows, cols) in enumerate(blocks):
+                found = self.solve(rows, cols, upper - cost - sum(bounds[n + 1:]))
+                if found is None:
+                    return None
+                chosen = chosen + found[0]
+                cost += found[1]
+            return chosen, cost
+
+        # branch on the hardest column, trying every row that covers it
+        best = None
+        col = min(column_rows.values(), key=lambda c: bin(c).count('1'))
+        branches = sorted((i.bit_length() - 1 for i in _bits(col)),
+                          key=lambda i: (-bin(self.rows[i] & uncovered).count('1'),
+                                         self.costs[i]))
+        for i in branches:
+            candidates = candidates - {i}
+            found = self.solve(candidates, uncovered & ~self.rows[i],
+                               upper - cost - self.costs[i])
+            if found is not None:
+                upper = cost + self.costs[i] + found[1]
+                best = (chosen + [i] + found[0], upper)
+        return best
+
+
+# find the cheapest set of rows covering every column of the chart,
+# returns the chosen row indexes and whether the cover is known to be minimal.
+# With no time left (time_budget <= 0) only the greedy cover is taken
+def select_cover(rows, costs, time_budget=None):
+    candidates = set(i for i in range(len(rows)) if rows[i])
+    universe = 0
+    for row in rows:
+        universe |= row
+    if time_budget is not None and time_budget <= 0:
+        return sorted(_greedy_cover(rows, costs, candidates, universe)), False
+
+    deadline = None
+    if time_budget is not None:
+        deadline = time.perf_counter() + time_budget
+    search = _CoverSearch(rows, costs, deadline)
+
+    # the greedy upper bound is taken after the first reduction,
+    # on what is left of the chart
+    chosen, cost, candidates, uncovered, _ = search.reduce(candidates, universe)
+    search.essentials = list(chosen)
+    best = search.greedy(candidates, uncovered)
+    found = search.solve(candidates, uncovered, best[1])
+    if found is not None:
+        best = found
+    return sorted(chosen + best[0]), search.minimal
+
+
+# Espresso style heuristic minimization over cube lists,
+# a cube is a (value, mask) tuple with the same bit layout as an Implicant
+
+def _to_cube(term):
+    if not isinstance(term, Implicant):
+        term = Implicant.from_term(term)
+    return term.value, term.mask
+
+
+def _cube_points(value, mask, full):
+    # every minterm of the cube
+    free = full & ~mask
+    sub = free
+    while True:
+        yield value | sub
+        if not sub:
+            return
+        sub = (sub - 1) & free
+
+
+def _cube_contains(cube1, cube2):
+    return not cube1[1] & ~cube2[1] and not (cube1[0] ^ cube2[0]) & cube1[1]
+
+
+def _cubes_intersect(cube1, cube2):
+    return not (cube1[0] ^ cube2[0]) & cube1[1] & cube2[1]
+
+
+# restrict cubes to the half space where bit has the given value
+def _cofactor_bit(cubes, bit, value):
+    keep = bit if value else 0
+    return [(v & ~bit, m & ~bit) for v, m in cubes
+            if not m & bit or v & bit == keep]
+
+
+# restrict cubes to the subspace of cube, dropping its literals
+def _cofactor(cubes, cube):
+    return [(v & ~cube[1], m & ~cube[1]) for v, m in cubes
+            if _cubes_intersect((v, m), cube)]
+
+
+def _splitting_bit(cubes):
+    # prefer the variable that appears in both polarities the most often
+    pos = neg = 0
+    counts = {}
+    for v, m in cubes:
+        pos |= v & m
+        neg |= ~v & m
+        for bit in _bits(m):
+            counts[bit] = counts.get(bit, 0) + 1
+    binate = pos & neg
+    return max(counts, key=lambda bit: (bool(bit & binate), counts[bit])), binate
+
+
+def _tautology(cubes):
+    if not cubes:
+        return False
+    for v, m in cubes:
+        if not m:
+            return True
+    bit, binate = _splitting_bit(cubes)
+    if not binate:
+        return False  # a unate cover is a tautology only with the universal cube
+    return (_tautology(_cofactor_bit(cubes, bit, 1))
+            and _tautology(_cofactor_bit(cubes, bit, 0)))
+
+
+def _complement(cubes):
+    if not cubes:
+        return [(0, 0)]
+    for v, m in cubes:
+        if not m:
+            return []
+    if len(cubes) == 1:
+        v, m = cubes[0]
+        return [(~v & bit, bit) for bit in _bits(m)]
+
+    bit = _splitting_bit(cubes)[0]
+    high = _complement(_cofactor_bit(cubes, bit, 1))
+    low = _complement(_cofactor_bit(cubes, bit, 0))
+    both = set(high) & set(low)
+    return (list(both)
+            + [(v | bit, m | bit) for v, m in high if (v, m) not in both]
+            + [(v, m | bit) for v, m in low if (v, m) not in both])
+
+
+def _supercube(cubes):
+    value, mask = cubes[0]
+    diff = 0
+    for v, m in cubes:
+        mask &= m
+        diff |= v ^ value
+    mask &= ~diff
+    return value & mask, mask
+
+
+def _cover_cost(cubes):
+    return len(cubes), sum(bin(m).count('1') for v, m in cubes)
+
+
+def espresso_expand(cubes, off):
+    """ Raise the literals of every cube as long as it misses the OFF-set. """
+    expanded = []
+    for cube in sorted(cubes, key=lambda c: bin(c[1]).count('1')):
+        if any(_cube_contains(other, cube) for other in expanded):
+            continue
+        value, mask = cube
+
+        # first raise the literals that let the cube reach the most other cubes
+        def reach(bit):
+            return sum(1 for v, m in cubes if not m & bit or (v ^ value) & bit)
+
+        for bit in sorted(_bits(mask), key=reach, reverse=True):
+            raised = (value & ~bit, mask & ~bit)
+            if not any(_cubes_intersect(raised, cube_off) for cube_off in off):
+                value, mask = raised
+        expanded.append((value, mask))
+
+    return [cube for i, cube in enumerate(expanded)
+            if not any(_cube_contains(other, cube) for other in expanded[i + 1:])]
+
+
+def espresso_irredundant(cubes, not_cares):
+    """ Drop every cube covered by the rest of the cover and the don't cares. """
+    cubes = sorted(cubes, key=lambda c: bin(c[1]).count('1'), reverse=True)
+    i = 0
+    while i < len(cubes):
+        rest = cubes[:i] + cubes[i + 1:] + not_cares
+        if _tautology(_cofactor(rest, cubes[i])):
+            cubes.pop(i)
+        else:
+            i += 1
+    return cubes
+
+
+def espresso_reduce(cubes, not_cares):
+    """ Shrink every cube to the smallest cube of what only it covers. """
+    cubes = sorted(cubes, key=lambda c: bin(c[1]).count('1'))
+    for i, cube in enumerate(cubes):
+        rest = [c for c in cubes[:i] + cubes[i + 1:] if c is not None] + not_cares
+        uncovered = _complement(_cofactor(rest, cube))
+        if not uncovered:
+            cubes[i] = None
+        else:
+            value, mask = _supercube(uncovered)
+            cubes[i] = (cube[0] | value, cube[1] | mask)
+    return [cube for cube in cubes if cube is not None]
+
+
+def espresso(on, not_cares=(), max_iterations=20):
+    """ Minimize the cubes of the ON-set with reduce / expand / irredundant
+    rounds, stopping when a round doesn't lower the cost of the cover. """
+    on, not_cares = list(on), list(not_cares)
+    off = _complement(on + not_cares)
+    cover = espresso_irredundant(espresso_expand(on, off), not_cares)
+    cost = _cover_cost(cover)
+    for _ in range(max_iterations):
+        new_cover = espresso_reduce(cover, not_cares)
+        new_cover = espresso_irredundant(espresso_expand(new_cover, off), not_cares)
+        new_cost = _cover_cost(new_cover)
+        if new_cost >= cost:
+            break
+        cover, cost = new_cover, new_cost
+    return cover
+
+
+FORMS = ('sop', 'pos', 'auto')
+
+
+def _literals(terms):
+    return sum(len(str(term)) - str(term).count('*') for term in terms)
+
+
+class Minterms(object):
+    """ Minterms stores expressions for 1s and "don't care" as Terms or Implicants. """
+
+    def __init__(self, minterms=None, maxterms=None, not_cares=None, nov=0):
+        if minterms is None:
+            minterms = []
+        if maxterms is None:
+            maxterms = []
+        if not_cares is None:
+            not_cares = []
+        if not minterms and not maxterms:
+            raise ValueError(
+                "Both of minterms and maxterms cannot be empty at the same time"
+            )
+        elif not minterms:
+            self.maxterms = maxterms
+            self.not_cares = not_cares
+            self.number_of_variables = nov if nov else self.maxterms[0].length
+            self._minterms = None  # generated when first needed
+        elif not maxterms:
+            self.minterms = minterms
+            self.not_cares = not_cares
+            self.number_of_variables = nov if nov else self.minterms[0].length
+            self._maxterms = None  # generated when first needed
+        else:
+            self.minterms = minterms
+            self.maxterms = maxterms
+            self.not_cares = not_cares
+            self.number_of_variables = nov if nov else self.maxterms[0].length
+        self.result = None  # result won't be calculated during initialization
+        self.primes = None
+        self.is_minimal = None
+        self.form = None  # 'sop' or 'pos', the form of the result
+        self.budget_hit = None  # the limit that stopped simplify, if any
+        self._incremental = None  # state of the edits, see _state
+
+    # the missing one of minterms and maxterms is only generated when used,
+    # listing the whole space is out of reach for wide functions
+    @property
+    def minterms(self):
+        if self._minterms is None:
+            self._generate_minterms()
+        return self._minterms
+
+    @minterms.setter
+    def minterms(self, minterms):
+        self._minterms = minterms
+
+    @property
+    def maxterms(self):
+        if self._maxterms is None:
+            self._generate_maxterms()
+        return self._maxterms
+
+    @maxterms.setter
+    def maxterms(self, maxterms):
+        self._maxterms = maxterms
+
+    def _generate_minterms(self):
+        nov = self.number_of_variables
+        if self._has_cubes():
+            self.minterms = self._complement_cubes(self.maxterms + self.not_cares)
+            return
+        known = set(str(term) for term in self.maxterms + self.not_cares)
+        minterms = []
+        full = (1 << nov) - 1
+        for i in range(2 ** nov):
+            term = self._cube_term(i, full)
+            if str(term) not in known:
+                minterms.append(term)
+
+        self.minterms = minterms
+
+    def _generate_maxterms(self):
+        nov = self.number_of_variables
+        if self._has_cubes():
+            self.maxterms = self._complement_cubes(self.minterms + self.not_cares)
+            return
+        known = set(str(term) for term in self.minterms + self.not_cares)
+        maxterms = []
+        full = (1 << nov) - 1
+        for i in range(2 ** nov):
+            term = self._cube_term(i, full)
+            if str(term) not in known:
+                maxterms.append(term)
+
+        self.maxterms = maxterms
+
+    def simplify(self, engine='bucketed', cover='exact', time_budget=None, stats=None,
+                 form='sop', max_implicants=None, max_memory=None, processes=None):
+        """ Minimize the function into result.
+
+        With form 'pos' the maxterms are minimized and result holds the
+        implicants of the OFF-set, one per sum, see wordify_pos. With form
+        'auto' both are minimized and the one with fewer literals is kept,
+        the SOP on ties. The form of the result is kept in form.
+
+        time_budget (seconds), max_implicants (terms in a combining round)
+        and max_memory (estimated bytes of a round) bound the whole call.
+        Past one of them the best cover found so far is kept, is_minimal is
+        False and budget_hit names the limit.
+
+        processes is the size of the process pool of the 'parallel' engine.
+        """
+        if form not in FORMS:
+            raise ValueError("Unknown form: {}".format(form))
+        budget = _Budget(time_budget, max_implicants, max_memory)
+        # edits after this call start from its result
+        self._incremental = None
+        self.budget_hit = None
+        if form != 'pos':
+            self._simplify(engine, cover, budget, stats, processes)
+            self.form = 'sop'
+        if form == 'sop' or (form == 'auto' and budget.exceeded):
+            return
+
+        # the function is always 1 without maxterms, the product of no sums
+        result, primes, is_minimal = [], [], True
+        if self.maxterms:
+            off = Minterms(self.maxterms, not_cares=self._off_not_cares(),
+                           nov=self.number_of_variables)
+            off._simplify(engine, cover, budget, stats, processes)
+            self.budget_hit = self.budget_hit or off.budget_hit
+            result, primes, is_minimal = off.result, off.primes, off.is_minimal
+        if form == 'auto' and _literals(self.result) <= _literals(result):
+            return
+        self.result, self.primes, self.is_minimal = result, primes, is_minimal
+        self.form = 'pos'
+
+    def _simplify(self, engine, cover, budget, stats, processes=None):
+        if cover not in ('exact', 'legacy'):
+            raise ValueError("Unknown cover stage: {}".format(cover))
+        if stats is not None:
+            stats.start_function()
+            start = time.perf_counter()
+
+        # cubes can only be combined by consensus, and the cover then
+        # needs the 1s of every cube
+        has_cubes = self._has_cubes()
+        if has_cubes:
+            if cover != 'exact':
+                raise ValueError("The legacy cover needs single minterms")
+            engine = 'consensus'
+
+        # work on new records of one type, the given terms are left as
+        # they are, the engines look at the first record for the type
+        records = self.not_cares + self.minterms
+        implicant = _are_implicants(records)
+        minterms_old = [_with_source(term, [idx], implicant)
+                        for idx, term in enumerate(records)]
+
+        minterms_old = prime_implicants(minterms_old, engine, stats, budget, processes)
+        self.primes = minterms_old
+        # past a limit the cover is only the greedy one over what was found
+        cover_budget = 0.0 if budget.exceeded else budget.remaining()
+        if stats is not None:
+            stats.add_time('combine', start)
+            start = time.perf_counter()
+
+        if has_cubes:
+            self.result = self._select_cube_cover(minterms_old, cover_budget)
+            if stats is not None:
+                stats.add_time('cover', start)
+        elif cover == 'exact':
+            self.result = self._select_cover(minterms_old, cover_budget)
+            if stats is not None:
+                stats.add_time('cover', start)
+        else:
+            minterms = remove_repeated_sources(minterms_old, minterms_old)
+            if stats is not None:
+                stats.add_time('remove_repeated_sources', start)
+                start = time.perf_counter()
+            print(minterms, self.not_cares)
+            self.result = remove_redundant_terms(minterms, self.not_cares)
+            self.is_minimal = False
+            if stats is not None:
+                stats.add_time('remove_redundant_terms', start)
+
+        # the cover search stops on its own at the deadline, the other
+        # limits are only checked while combining
+        if budget.deadline is not None and not self.is_minimal:
+            budget.check(0)
+        self.budget_hit = budget.exceeded
+        if self.budget_hit is not None:
+            self.is_minimal = False
+
+        if stats is not None:
+            stats.primes += len(self.primes)
+            stats.cover_terms += len(self.result)
+            stats.non_minimal += not self.is_minimal
+            stats.budget_hits += self.budget_hit is not None
+
+    def _off_not_cares(self):
+        # the "don't cares" that are not also 1s, as they are 0s
+        # in the complemented function
+        if not self._has_cubes():
+            minterms = set(str(term) for term in self.minterms)
+            return [term for term in self.not_cares if str(term) not in minterms]
+        off = _complement([_to_cube(term) for term in self.minterms])
+        not_cares = []
+        for value, mask in (_to_cube(term) for term in self.not_cares):
+            for cube in off:
+                if _cubes_intersect((value, mask), cube):
+                    not_cares.append(self._cube_term(value | cube[0], mask | cube[1]))
+        return not_cares
+
+    def _complement_cubes(self, terms):
+        cubes = _complement([_to_cube(term) for term in terms])
+        return [self._cube_term(value, mask) for value, mask in cubes]
+
+    def _cube_term(self, value, mask):
+        # an Implicant when the given terms are Implicants, a Term otherwise
+        term = Implicant(value, mask, self.number_of_variables)
+        given = self._minterms or self._maxterms or self.not_cares
+        return term if _are_implicants(given) else term.to_term()
+
+    def _has_cubes(self):
+        full = (1 << self.number_of_variables) - 1
+        terms = self.not_cares + (self.minterms if self._minterms is not None else [])
+        terms += self.maxterms if self._maxterms is not None else []
+        return any(_to_cube(term)[1] != full for term in terms)
+
+    def _select_cube_cover(self, primes, time_budget=None):
+        # one column per set of ON points covered by the same primes. Every
+        # ON cube is split while one of the primes it meets cuts through
+        # it, the parts are then covered by all the primes they meet, and
+        # parts met by the same primes share a column. No ON cube is
+        # expanded into its points
+        nov = self.number_of_variables
+        cubes = [_to_cube(term) for term in primes]
+        columns = {}
+        stack = [(value, mask, [i for i, cube in enumerate(cubes)
+                                if _cubes_intersect(cube, (value, mask))])
+                 for value, mask in set(_to_cube(term) for term in self.minterms)]
+        while stack:
+            value, mask, meeting = stack.pop()
+            cut = 0
+            for i in meeting:
+                cut = cubes[i][1] & ~mask
+                if cut:
+                    break
+            if not cut:
+                columns.setdefault(sum(1 << i for i in meeting), len(columns))
+                continue
+            bit = cut & -cut
+            for half in (value & ~bit, value | bit):
+                stack.append((half, mask | bit, [i for i in meeting if _cubes_intersect(
+                    cubes[i], (half, mask | bit))]))
+
+        rows = [0] * len(primes)
+        for primes_of, column in columns.items():
+            for bit in _bits(primes_of):
+                rows[bit.bit_length() - 1] |= 1 << column
+
+        term_cost = nov * len(primes) + 1
+        costs = [term_cost + nov - str(term).count('*') for term in primes]
+
+        chosen, self.is_minimal = select_cover(rows, costs, time_budget)
+        return [primes[i] for i in chosen]
+
+    def _select_cover(self, primes, time_budget=None):
+        # one column per distinct minterm, don't cares equal to a minterm
+        # point to its column as well
+        columns = {}
+        for term in self.minterms:
+            columns.setdefault(str(term), len(columns))
+        column_of = {}
+        for idx, term in enumerate(self.not_cares + self.minterms):
+            if str(term) in columns:
+                column_of[idx] = columns[str(term)]
+
+        rows = []
+        for term in primes:
+            row = 0
+            for idx in term.source:
+                if idx in column_of:
+                    row |= 1 << column_of[idx]
+            rows.append(row)
+
+        # fewer terms first, then fewer literals
+        nov = self.number_of_variables
+        term_cost = nov * len(primes) + 1
+        costs = [term_cost + nov - str(term).count('*') for term in primes]
+
+        chosen, self.is_minimal = select_cover(rows, costs, time_budget)
+        return [primes[i] for i in chosen]
+
+    # incremental edits, after simplify the primes are kept as cubes with
+    # an index from every 1 and "don't care" to the primes containing it,
+    # so that an edit only touches the primes through the edited minterm
+    # and only the part of the chart they are connected to is solved again
+
+    def add_minterm(self, term, time_budget=None):
+        """ Make term a 1 of the function and update the result. """
+        self._edit(term, on=True, not_care=False, time_budget=time_budget)
+
+    def remove_minterm(self, term, time_budget=None):
+        """ Make the minterm term a 0 of the function and update the result. """
+        if self._point(term) not in self._state()['on']:
+            raise ValueError("{} is not a minterm".format(term))
+        self._edit(term, on=False, not_care=False, time_budget=time_budget)
+
+    def add_not_care(self, term, time_budget=None):
+        """ Make term a "don't care" of the function and update the result. """
+        self._edit(term, on=False, not_care=True, time_budget=time_budget)
+
+    def remove_not_care(self, term, time_budget=None):
+        """ Make the "don't care" term a 0 of the function and update the result. """
+        if self._point(term) not in self._state()['dc']:
+            raise ValueError("{} is not a don't care".format(term))
+        self._edit(term, on=False, not_care=False, time_budget=time_budget)
+
+    def _point(self, term):
+        value, mask = _to_cube(term)
+        if term.length != self.number_of_variables or mask != (1 << term.length) - 1:
+            raise ValueError("Expected a minterm of {} variables, got {}".format(
+                self.number_of_variables, term))
+        return value
+
+    def _state(self):
+        if self._incremental is not None:
+            return self._incremental
+        if self._has_cubes():
+            raise ValueError("Incremental edits need single minterms")
+        if self.form != 'sop' or self.budget_hit is not None:
+            # edits start from the full set of primes
+            self.simplify()
+
+        state = {
+            'on': set(self._point(term) for term in self.minterms),
+            'primes': set(_to_cube(term) for term in self.primes),
+            'chosen': set(_to_cube(term) for term in self.result),
+            'covering': {},
+        }
+        state['dc'] = set(self._point(term) for term in self.not_cares) - state['on']
+        for cube in state['primes']:
+            self._index_prime(state, cube, True)
+        self._incremental = state
+        return state
+
+    def _index_prime(self, state, cube, add):
+        full = (1 << self.number_of_variables) - 1
+        for point in _cube_points(cube[0], cube[1], full):
+            primes = state['covering'].setdefault(point, set())
+            if add:
+                primes.add(cube)
+            else:
+                primes.discard(cube)
+
+    def _primes_through(self, state, point):
+        # depth first search over the cubes through point, raising one
+        # variable at a time while the cube stays inside the care set
+        full = (1 << self.number_of_variables) - 1
+        care = state['on'] | state['dc']
+
+        def inside(value, mask):
+            return all(p in care for p in _cube_points(value, mask, full))
+
+        found = set()
+        seen = set()
+        stack = [(point, full)]
+        while stack:
+            value, mask = stack.pop()
+            raised = False
+            for bit in _bits(mask):
+                # the other half of the raised cube must be in the care set
+                if inside(value ^ bit, mask):
+                    raised = True
+                    cube = (value & ~bit, mask & ~bit)
+                    if cube not in seen:
+                        seen.add(cube)
+                        stack.append(cube)
+            if not raised:
+                found.add((value, mask))
+        return found
+
+    def _edit(self, term, on, not_care, time_budget):
+        point = self._point(term)
+        state = self._state()
+        was_on, was_dc = point in state['on'], point in state['dc']
+        if (was_on, was_dc) == (on, not_care):
+            return
+
+        # the term lists follow the edit
+        key = str(term)
+        self.minterms = [t for t in self.minterms if str(t) != key]
+        self.not_cares = [t for t in self.not_cares if str(t) != key]
+        if self._maxterms is not None:
+            self._maxterms = [t for t in self._maxterms if str(t) != key]
+        if on:
+            self.minterms.append(term)
+        elif not_care:
+            self.not_cares.append(term)
+        elif self._maxterms is not None:
+            self._maxterms.append(term)
+
+        state['on'].discard(point)
+        state['dc'].discard(point)
+        if on:
+            state['on'].add(point)
+        elif not_care:
+            state['dc'].add(point)
+
+        added, removed = set(), set()
+        primes = state['primes']
+        if not (was_on or was_dc):
+            # a new point of the care set, the primes it grows replace
+            # the primes they contain
+            added = self._primes_through(state, point) - primes
+            removed = set(p for p in primes
+                          if any(_cube_contains(n, p) for n in added))
+        elif not (on or not_care):
+            # the primes through the point shrink into their halves
+            # that miss it, the largest of those halves are primes
+            removed = set(state['covering'].pop(point, ()))
+            full = (1 << self.number_of_variables) - 1
+            halves = set()
+            for value, mask in removed:
+                for bit in _bits(full & ~mask):
+                    halves.add(((value & ~bit) | (~point & bit), mask | bit))
+            survivors = primes - removed
+            added = set(h for h in halves
+                        if not any(_cube_contains(c, h) and c != h
+                                   for c in itertools.chain(survivors, halves)))
+        for cube in removed:
+            primes.discard(cube)
+            self._index_prime(state, cube, False)
+        for cube in added:
+            primes.add(cube)
+            self._index_prime(state, cube, True)
+        self._solve_locally(state, point, added, removed, time_budget)
+
+    def _solve_locally(self, state, point, added, removed, time_budget,
+                       component_limit=64):
+        full = (1 << self.number_of_variables) - 1
+        on = state['on']
+        covering = state['covering']
+
+        def ones(cube):
+            return [p for p in _cube_points(cube[0], cube[1], full) if p in on]
+
+        # the primes next to the edit: the new ones, the ones through the
+        # edited point and the ones sharing a 1 with a new or dropped prime
+        seeds = set(ones((point, full)))
+        for cube in added | removed:
+            seeds.update(ones(cube))
+        rows = set(added)
+        rows.update(p for p in covering.get(point, ()) if p in state['primes'])
+        for column in seeds:
+            rows.update(covering.get(column, ()))
+
+        # grow them to the connected part of the chart, which can be solved
+        # exactly on its own, unless it gets too large
+        closed = True
+        queue = list(rows)
+        while queue:
+            if len(rows) > component_limit:
+                closed = False
+                rows = set(added)
+                rows.update(covering.get(point, ()))
+                for column in seeds:
+                    rows.update(covering.get(column, ()))
+                break
+            for column in ones(queue.pop()):
+                for cube in covering.get(column, ()):
+                    if cube not in rows:
+                        rows.add(cube)
+                        queue.append(cube)
+
+        # the chosen primes away from the edit stay, the columns they
+        # leave uncovered are solved with the primes next to the edit
+        fixed = state['chosen'] - removed - rows
+        columns = {}
+        for cube in rows:
+            for p in ones(cube):
+                if p not in columns and not covering[p] & fixed:
+                    columns[p] = len(columns)
+        rows = sorted(rows)
+        bitsets = []
+        for cube in rows:
+            bitset = 0
+            for p in ones(cube):
+                if p in columns:
+                    bitset |= 1 << columns[p]
+            bitsets.append(bitset)
+        nov = self.number_of_variables
+        term_cost = nov * len(rows) + 1
+        costs = [term_cost + bin(mask).count('1') for value, mask in rows]
+        picked, minimal = select_cover(bitsets, costs, time_budget)
+
+        chosen = fixed | set(rows[i] for i in picked)
+        state['chosen'] = chosen
+        self.is_minimal = bool(self.is_minimal and minimal and closed)
+        self.primes = [self._cube_term(v, m) for v, m in sorted(state['primes'])]
+        self.result = [self._cube_term(v, m) for v, m in sorted(chosen)]
+
+    def espresso(self, max_iterations=20, exact_limit=12, time_budget=None):
+        """ Heuristic minimization for wide functions.
+
+        Returns a report with the size of the result and, for functions
+        of at most exact_limit variables given as minterms, the size of
+        the exact cover found by simplify.
+        """
+        nov = self.number_of_variables
+        on = [_to_cube(term) for term in self.minterms]
+        not_cares = [_to_cube(term) for term in self.not_cares]
+
+        result = [Implicant(v, m, nov) for v, m in espresso(on, not_cares, max_iterations)]
+        if not _are_implicants(self.minterms):
+            result = [term.to_term() for term in result]
+        self.result = result
+        self.is_minimal = False
+
+        terms, literals = _cover_cost([_to_cube(term) for term in result])
+        report = {'terms': terms, 'literals': literals,
+                  'exact_terms': None, 'exact_literals': None}
+
+        full = (1 << nov) - 1
+        if nov <= exact_limit and all(m == full for v, m in on + not_cares):
+            exact = Minterms([Implicant(v, m, nov) for v, m in on],
+                             not_cares=[Implicant(v, m, nov) for v, m in not_cares],
+                             nov=nov)
+            exact.simplify(time_budget=time_budget)
+            if exact.is_minimal:
+                report['exact_terms'], report['exact_literals'] = _cover_cost(
+                    [_to_cube(term) for term in exact.result])
+                self.is_minimal = (terms, literals) == (
+                    report['exact_terms'], report['exact_literals'])
+
+        return report
+
+
+class MultiMinterms(object):
+    """ MultiMinterms minimizes several functions of the same variables together.
+
+    outputs is a list of (minterms, not_cares) pairs of Terms or Implicants.
+    Product terms are shared between the outputs and the cover has the
+    fewest distinct terms, then the fewest literals among them.
+    """
+
+    def __init__(self, outputs, nov=0):
+        self.outputs = [(list(minterms), list(not_cares)) for minterms, not_cares in outputs]
+        if not self.outputs:
+            raise ValueError("At least one output is needed")
+        terms = [term for minterms, not_cares in self.outputs
+                 for term in minterms + not_cares]
+        if not nov:
+            if not terms:
+                raise ValueError("The number of variables is needed for constant outputs")
+            nov = terms[0].length
+        if any(term.length != nov for term in terms):
+            raise ValueError("All outputs must have {} variables".format(nov))
+        self.number_of_variables = nov
+        self.result = None  # one list of terms per output
+        self.terms = None  # the distinct product terms of the result
+        self.primes = None
+        self.is_minimal = None
+
+    def _points(self):
+        # tag and source of every minterm, and which outputs it is a 1 of
+        full = (1 << self.number_of_variables) - 1
+        points = {}
+        on = {}
+        for output, (minterms, not_cares) in enumerate(self.outputs):
+            bit = 1 << output
+            for term, is_on in itertools.chain(((term, True) for term in minterms),
+                                               ((term, False) for term in not_cares)):
+                cube = _to_cube(term)
+                if cube[1] != full:
+                    raise ValueError("Expected single minterms, got {}".format(term))
+                value = cube[0]
+                if value not in points:
+                    points[value] = (0, [len(points)])
+                    on[value] = 0
+                points[value] = (points[value][0] | bit, points[value][1])
+                if is_on:
+                    on[value] |= bit
+        return points, on
+
+    def simplify(self, time_budget=None, stats=None):
+        if stats is not None:
+            stats.start_function()
+            start = time.perf_counter()
+
+        nov = self.number_of_variables
+        points, on = self._points()
+        self.primes = multi_output_primes(points, nov, stats)
+        if stats is not None:
+            stats.add_time('combine', start)
+            start = time.perf_counter()
+
+        # one column per 1 of every output
+        on_of = [0] * len(points)
+        for value, (tag, source) in points.items():
+            on_of[source[0]] = on[value]
+        columns = {}
+        rows = []
+        for term, tag in self.primes:
+            row = 0
+            for idx in term.source:
+                for bit in _bits(on_of[idx] & tag):
+                    column = columns.setdefault((bit, idx), len(columns))
+                    row |= 1 << column
+            rows.append(row)
+
+        # fewer distinct terms first, then fewer literals, a shared term
+        # is only paid for once
+        term_cost = nov * len(self.primes) + 1
+        costs = [term_cost + bin(term.mask).count('1') for term, tag in self.primes]
+        chosen, self.is_minimal = select_cover(rows, costs, time_budget)
+
+        self.result = [self._output_cover(output, chosen, rows, columns, costs)
+                       for output in range(len(self.outputs))]
+        used = set(i for cover in self.result for i in cover)
+        self.terms = [self._to_result(self.primes[i][0]) for i in sorted(used)]
+        self.result = [[self._to_result(self.primes[i][0]) for i in cover]
+                       for cover in self.result]
+        if stats is not None:
+            stats.add_time('cover', start)
+            stats.primes += len(self.primes)
+            stats.cover_terms += len(self.terms)
+            stats.non_minimal += not self.is_minimal
+
+    def _output_cover(self, output, chosen, rows, columns, costs):
+        # the chosen terms an output needs, a term covering only 1s
+        # that other terms of the output cover is left out of it
+        bit = 1 << output
+        own = 0
+        for (column_bit, idx), column in columns.items():
+            if column_bit == bit:
+                own |= 1 << column
+        needed = [i for i in chosen if self.primes[i][1] & bit and rows[i] & own]
+        for i in sorted(needed, key=lambda i: -costs[i]):
+            others = 0
+            for j in needed:
+                if j != i:
+                    others |= rows[j]
+            if not rows[i] & own & ~others:
+                needed.remove(i)
+        return needed
+
+    def _to_result(self, term):
+        for minterms, not_cares in self.outputs:
+            if minterms or not_cares:
+                if not _are_implicants(minterms or not_cares):
+                    return term.to_term()
+                break
+        return Implicant(term.value, term.mask, term.length)
+
+
+def to_bin(m, nov):
+    """ Binary string of minterm m over nov variables. """
+    return "{1:0{0}b}".format(nov, m)
+
+
+def number_of_variables(max_mt):
+    """ Variables needed for minterms up to max_mt, at least 4 as on the K-map. """
+    return max(4, max_mt.bit_length())
+
+
+def variable_names(nov):
+    """ A to Z for the first 26 variables, then x26, x27, ... """
+    return [chr(ord('A') + i) if i < 26 else 'x{}'.format(i) for i in range(nov)]
+
+
+def wordify(result, max_mt, nov=None):
+    if not nov:
+        nov = number_of_variables(max_mt)
+    w = variable_names(nov)
+
+    words = ""
+    for terms in result:
+        # an Implicant builds its string on every read of term
+        text = str(terms)
+        for i in range(nov):
+            if len(text) != 0:
+                if text[i] == '0':
+                    words += str(w[i] + "\'")
+                elif text[i] == '1':
+                    words += str(w[i])
+                elif text[i] == '*':
+                    pass
+        words += " + "
+    words = words[:-3]
+    return words
+
+
+def wordify_pos(result, max_mt, nov=None):
+    """ Product of sums of the OFF-set implicants in result.
+
+    A '1' in a term becomes a complemented variable in its sum and a '0'
+    a plain one, as the sum is the complement of the term.
+    """
+    if not nov:
+        nov = number_of_variables(max_mt)
+    w = variable_names(nov)
+
+    sums = []
+    for term in result:
+        literals = []
+        for i, c in enumerate(str(term)):
+            if c == '1':
+                literals.append(w[i] + "\'")
+            elif c == '0':
+                literals.append(w[i])
+        if not literals:
+            return '0'
+        if len(literals) == 1:
+            sums.append(literals[0])
+        else:
+            sums.append("(" + " + ".join(literals) + ")")
+    return "".join(sums)
+
+
+def term_cells(term):
+    """ Minterm numbers of the K-map cells a term covers, in order. """
+    value, mask = _to_cube(term)
+    return sorted(_cube_points(value, mask, (1 << term.length) - 1))
+
+
+def kmap_groups(result):
+    """ The cells of every term of a result, the groups drawn on the K-map. """
+    return [term_cells(term) for term in result]
+
+
+def _gray_position(code):
+    position = 0
+    while code:
+        position ^= code
+        code >>= 1
+    return position
+
+
+def kmap_grid(nov):
+    """ [row, column] of every cell of a K-map of nov variables.
+
+    The first nov // 2 variables pick the row and the others the column,
+    both in Gray code order so that neighbouring cells differ in one bit.
+    """
+    column_bits = nov - nov // 2
+    columns = (1 << column_bits) - 1
+    return [[_gray_position(m >> column_bits), _gray_position(m & columns)]
+            for m in range(2 ** nov)]
+
+
+def minterms_to_bin(mt, max_mt, nov=None):
+    if not nov:
+        nov = number_of_variables(max_mt)
+    for m in mt:
+        if m < 0:
+            raise ValueError("minterm {} is negative".format(m))
+        if m >= 2 ** nov:
+            raise ValueError("minterm {} needs more than {} variables".format(m, nov))
+    return [to_bin(m, nov) for m in mt]
+
+
+def minimize_terms(mt, dc=(), nov=None, **options):
+    """ Minimize the function given by minterm and "don't care" numbers.
+
+    Returns the result Terms and their number of variables, which is nov
+    or at least 4 when nov is not given. The options go to Minterms.simplify,
+    with form 'pos' or 'auto' the Terms may be sums, see _minimize_minterms.
+    """
+    minterms, nov = _minimize_minterms(mt, dc, nov, **options)
+    return (minterms.result if minterms else []), nov
+
+
+def _minimize_minterms(mt, dc=(), nov=None, **options):
+    # the simplified Minterms, None for a function without minterms
+    mt, dc = list(mt), list(dc)
+    if not nov:
+        nov = number_of_variables(max(mt + dc))
+    if not mt:
+        return None, nov
+
+    t_minterms = [Term(term) for term in minterms_to_bin(mt, None, nov)]
+    not_cares = [Term(term) for term in minterms_to_bin(dc, None, nov)]
+    maxterms = None
+    if options.get('form', 'sop') != 'sop':
+        # split the truth table once, the maxterms are everything else
+        known = set(mt)
+        known.update(dc)
+        maxterms = [Term(to_bin(m, nov)) for m in range(2 ** nov) if m not in known]
+    minterms = Minterms(t_minterms, maxterms, not_cares=not_cares, nov=nov)
+    minterms.simplify(**options)
+    return minterms, nov
+
+
+def minimize(mt, dc=(), nov=None, **options):
+    """ Minimize the function given by minterm and "don't care" numbers.
+
+    Returns the SOP from wordify, or the POS from wordify_pos with form
+    'pos' or 'auto', '0' or '1' for constant functions.
+    The options go to Minterms.simplify.
+    """
+    return _minimize(mt, dc, nov, **options)[0]
+
+
+def _minimize(mt, dc=(), nov=None, **options):
+    # minimize, with the budget_hit of simplify, for callers that keep results
+    if not mt:
+        return '0', None
+    minterms, nov = _minimize_minterms(mt, dc, nov, **options)
+    words = wordify_pos if minterms.form == 'pos' else wordify
+    stats = options.get('stats')
+    if stats is not None:
+        start = time.perf_counter()
+        words = words(minterms.result, None, nov)
+        stats.add_time('wordify', start)
+        return words or '1', minterms.budget_hit
+    return words(minterms.result, None, nov) or '1', minterms.budget_hit
+
+
+def minimize_cubes(on, dc=(), **options):
+    """ Minimize the function given by ON and "don't care" cubes like '1--0'.
+
+    A '-' (or '*') is a missing variable, so large regions are never
+    expanded into minterms. Returns the same strings as minimize.
+    """
+    on = [Term(cube.replace('-', '*')) for cube in on]
+    dc = [Term(cube.replace('-', '*')) for cube in dc]
+    if not on:
+        return '0'
+    nov = on[0].length
+    if any(term.length != nov for term in on + dc):
+        raise ValueError("All cubes must have {} variables".format(nov))
+
+    minterms = Minterms(on, not_cares=dc, nov=nov)
+    minterms.simplify(**options)
+    words = wordify_pos if minterms.form == 'pos' else wordify
+    return words(minterms.result, None, nov) or '1'
+
+
+def minimize_multi(functions, nov=None, **options):
+    """ Minimize several functions of the same variables with shared terms.
+
+    functions is a list of (minterms, not_cares) pairs of numbers. Returns
+    the SOP of every function, '0' or '1' for constant functions. The
+    options go to MultiMinterms.simplify.
+    """
+    functions = [(list(mt), list(dc)) for mt, dc in functions]
+    if not nov:
+        nov = number_of_variables(max([m for mt, dc in functions for m in mt + dc] or [0]))
+
+    outputs = [([Term(term) for term in minterms_to_bin(mt, None, nov)],
+                [Term(term) for term in minterms_to_bin(dc, None, nov)])
+               for mt, dc in functions]
+    minterms = MultiMinterms(outputs, nov)
+    minterms.simplify(**options)
+    return [wordify(result, None, nov) or '1' if mt else '0'
+            for result, (mt, dc) in zip(minterms.result, functions)]
@@ -0,0 +1,197 @@
+#!/usr/local/bin/python3
+
+
+# NPN canonical forms of truth tables, so that functions equal up to
+# permuting and negating their inputs share one minimization.
+#
+# A truth table is an int whose bit m is the value of the function on
+# minterm m. A transform is (order, neg, out_neg): canonical variable k
+# (bit k of the canonical minterm) is original variable order[k],
+# negated when bit order[k] of neg is set, and out_neg tells whether
+# the canonical table is the OFF-set of the function.
+# Author: Anuj Gautam
+
+import itertools
+import math
+
+from kmap_cache import MinimizeCache, truth_table_key
+from kmap_core import Term, _minimize_minterms, minimize, number_of_variables, wordify
+
+MAX_NPN_VARIABLES = 8
+
+
+def _var_masks(nov):
+    # masks[j] has bit x set for every minterm x with bit j cleared
+    full = (1 << (1 << nov)) - 1
+    masks = []
+    for j in range(nov):
+        block = (1 << (1 << j)) - 1
+        mask = 0
+        for start in range(0, 1 << nov, 2 << j):
+            mask |= block << start
+        masks.append(mask & full)
+    return masks
+
+
+def _negate_var(table, j, masks):
+    shift = 1 << j
+    return ((table & masks[j]) << shift) | ((table >> shift) & masks[j])
+
+
+def _swap_vars(table, i, j, masks):
+    if i > j:
+        i, j = j, i
+    shift = (1 << j) - (1 << i)
+    low = ~masks[i] & masks[j]   # bit i set, bit j cleared
+    high = masks[i] & ~masks[j]  # bit i cleared, bit j set
+    return (table & ~(low | high)) | ((table & low) << shift) | ((table & high) >> shift)
+
+
+def apply_transform(table, transform, masks):
+    """ Table of the function in the canonical variables of transform. """
+    order, neg, _ = transform
+    for j in range(len(order)):
+        if neg >> j & 1:
+            table = _negate_var(table, j, masks)
+    current = list(range(len(order)))
+    for k, var in enumerate(order):
+        b = current.index(var)
+        if b != k:
+            table = _swap_vars(table, k, b, masks)
+            current[k], current[b] = current[b], current[k]
+    return table
+
+
+def npn_canonical(on, not_care, nov, limit=720):
+    """ Canonical (table, not_care, transform) of a function, or None when
+    more than limit candidate transforms would have to be compared. """
+    if nov > MAX_NPN_VARIABLES:
+        return None
+    masks = _var_masks(nov)
+    full = (1 << (1 << nov)) - 1
+    off = full & ~on & ~not_care
+
+    # the output phase with fewer 1s, both when they tie
+    ones, zeros = bin(on).count('1'), bin(off).count('1')
+    phases = [(on, False)] if ones < zeros else [(off, True)]
+    if ones == zeros:
+        phases.append((on, False))
+
+    candidates = []
+    for table, out_neg in phases:
+        # each input phase gives its positive cofactor fewer 1s,
+        # both when the cofactors tie
+        signature = []
+        choices = []
+        for j in range(nov):
+            low = bin(table & masks[j]).count('1')
+            high = bin(table & ~masks[j]).count('1')
+            signature.append(min(low, high))
+            choices.append((0,) if high < low else (1,) if high > low else (0, 1))
+
+        # variables are ordered by signature, every order of tied
+        # variables has to be tried
+        groups = [list(group) for _, group in itertools.groupby(
+            sorted(range(nov), key=lambda j: signature[j]), key=lambda j: signature[j])]
+        count = 1
+        for group in groups:
+            count *= math.factorial(len(group))
+        for choice in choices:
+            count *= len(choice)
+        if len(candidates) + count > limit:
+            return None
+
+        for orders in itertools.product(*(itertools.permutations(g) for g in groups)):
+            order = [var for group in orders for var in group]
+            for bits in itertools.product(*choices):
+                neg = sum(bit << j for j, bit in enumerate(bits))
+                candidates.append((table, (order, neg, out_neg)))
+
+    best = None
+    for table, transform in candidates:
+        key = (apply_transform(table, transform, masks),
+               apply_transform(not_care, transform, masks))
+        if best is None or key < best[:2]:
+            best = key + (transform,)
+    return best
+
+
+def map_term(term, transform):
+    """ Map a Term over the canonical variables back to the original ones. """
+    order, neg, _ = transform
+    width = len(term.term)
+    chars = ['*'] * width
+    for k, var in enumerate(order):
+        char = term.term[width - 1 - k]
+        if char != '*':
+            char = str(int(char) ^ (neg >> var & 1))
+        chars[width - 1 - var] = char
+    return Term(''.join(chars))
+
+
+class NPNCache(MinimizeCache):
+    """ MinimizeCache keyed by the NPN canonical form of the function.
+
+    The cover of the canonical function is kept and mapped back through
+    the transform of every function that hits it. Since the SOP of a
+    function and of its complement are different minimizations, the
+    output phase stays part of the key.
+    """
+
+    def __init__(self, maxsize=4096, path=None, commit_every=256, limit=720):
+        super(NPNCache, self).__init__(maxsize, path, commit_every)
+        self.limit = limit
+        self.not_canonical = 0
+
+    @staticmethod
+    def _db_key(key):
+        if isinstance(key[-1], str):
+            # a function cached with another form than SOP
+            return MinimizeCache._db_key(key)
+        table, not_care, nov, out_neg = key
+        return "npn:{}:{}:{:x}:{:x}".format(nov, int(out_neg), table, not_care)
+
+    def minimize(self, mt, dc=(), nov=None, **options):
+        mt, dc = list(mt), list(dc)
+        if not mt:
+            return '0'
+        if options.get('form', 'sop') != 'sop' or options.get('cover', 'exact') != 'exact':
+            # the shared covers are exact SOPs, other forms are cached as
+            # they are and legacy covers not at all
+            return super(NPNCache, self).minimize(mt, dc, nov, **options)
+        if min(mt + dc) < 0:
+            raise ValueError("minterm {} is negative".format(min(mt + dc)))
+        width = nov if nov else number_of_variables(max(mt + dc))
+        if max(mt + dc) >= 1 << width:
+            raise ValueError("minterm {} needs more than {} variables".format(max(mt + dc), width))
+        on, not_care, _ = truth_table_key(mt, dc)
+
+        canonical = npn_canonical(on, not_care, width, self.limit)
+        if canonical is None:
+            self.not_canonical += 1
+            return minimize(mt, dc, nov, **options)
+        table, not_care, transform = canonical
+        out_neg = transform[2]
+        key = (table, not_care, width, out_neg)
+
+        cover = self.get(key)
+        if cover is None:
+            if out_neg:
+                table = ((1 << (1 << width)) - 1) & ~table & ~not_care
+            minterms, _ = _minimize_minterms(
+                [m for m in range(1 << width) if table >> m & 1],
+                [m for m in range(1 << width) if not_care >> m & 1],
+                width, **options)
+            result = minterms.result if minterms else []
+            cover = ' '.join(term.term for term in result)
+            # like MinimizeCache, a cover cut short by a budget isn't kept
+            if minterms is None or minterms.budget_hit is None:
+                self.put(key, cover)
+
+        terms = [map_term(Term(term), transform) for term in cover.split()]
+        return wordify(terms, None, width) or '1'
+
+    def stats(self):
+        stats = super(NPNCache, self).stats()
+        stats['not_canonical'] = self.not_canonical
+        return stats
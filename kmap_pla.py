@@ -0,0 +1,286 @@
+#!/usr/local/bin/python3
+
+
+# Berkeley PLA and simple BLIF input, PLA output.
+#
+# The readers go through the file line by line and keep every cube as an
+# Implicant, a '-' input is a cleared mask bit, so a cube is never expanded
+# into its minterms. Character i of a cube is variable i, as in a Term.
+#
+# usage: python kmap_pla.py [file] [-o out.pla]
+# Author: Anuj Gautam
+
+import argparse
+import sys
+
+from kmap_core import Implicant, _complement, espresso, variable_names
+
+
+class Pla(object):
+    """ Pla stores the ON, "don't care" and OFF cubes of every output.
+
+    on, dc and off hold one list of Implicants per output. An OFF-set is
+    only known for the 'fr' and 'fdr' types, see not_cares.
+    """
+
+    def __init__(self, inputs, outputs, input_names=None, output_names=None,
+                 pla_type='fd'):
+        self.inputs = inputs
+        self.outputs = outputs
+        self.input_names = input_names or variable_names(inputs)
+        self.output_names = output_names or ['f{}'.format(i) for i in range(outputs)]
+        self.type = pla_type
+        self.on = [[] for _ in range(outputs)]
+        self.dc = [[] for _ in range(outputs)]
+        self.off = [[] for _ in range(outputs)]
+
+    def add_cube(self, cube, outputs):
+        """ Add an input cube like '01-1' with its output characters. """
+        if len(cube) != self.inputs or len(outputs) != self.outputs:
+            raise ValueError("expected {} inputs and {} outputs, got {!r} {!r}".format(
+                self.inputs, self.outputs, cube, outputs))
+        term = cube_to_implicant(cube)
+        for output, c in enumerate(outputs):
+            if c == '1' or c == '4':
+                if 'f' in self.type:
+                    self.on[output].append(term)
+            elif c == '-' or c == '2':
+                if 'd' in self.type:
+                    self.dc[output].append(term)
+            elif c == '0' or c == '3':
+                if 'r' in self.type:
+                    self.off[output].append(term)
+            elif c != '~':
+                raise ValueError("unknown output value {!r}".format(c))
+
+    def not_cares(self, output):
+        """ The "don't care" cubes of an output. With a type without 'd'
+        and with an OFF-set, everything outside the ON and OFF-sets. """
+        if 'r' in self.type and 'd' not in self.type:
+            return [Implicant(v, m, self.inputs) for v, m in _complement(
+                [(t.value, t.mask) for t in self.on[output] + self.off[output]])]
+        return list(self.dc[output])
+
+
+def cube_to_implicant(cube):
+    """ Implicant of a PLA input cube, '-' (or '2') for a missing variable. """
+    value = mask = 0
+    for c in cube:
+        value <<= 1
+        mask <<= 1
+        if c == '1':
+            value |= 1
+            mask |= 1
+        elif c == '0':
+            mask |= 1
+        elif c != '-' and c != '2':
+            raise ValueError("unknown input value {!r} in {!r}".format(c, cube))
+    return Implicant(value, mask, len(cube))
+
+
+def _lines(stream):
+    # lines without comments, joined over '\' continuations
+    pending = ''
+    for line in stream:
+        line = line.split('#', 1)[0].rstrip()
+        if line.endswith('\\'):
+            pending += line[:-1] + ' '
+            continue
+        line = (pending + line).strip()
+        pending = ''
+        if line:
+            yield line
+    if pending.strip():
+        yield pending.strip()
+
+
+def read_pla(stream):
+    """ Read a Berkeley PLA file from an iterable of lines into a Pla. """
+    header = {}
+    pla = None
+    for line in _lines(stream):
+        if line.startswith('.'):
+            fields = line.split()
+            keyword = fields[0]
+            if keyword == '.e' or keyword == '.end':
+                break
+            if pla is not None and keyword in ('.i', '.o', '.ilb', '.ob', '.type'):
+                raise ValueError("{} after the first cube".format(keyword))
+            header[keyword] = fields[1:]
+            continue
+
+        if pla is None:
+            pla = _new_pla(header)
+        fields = line.split()
+        if len(fields) == 1 and pla.outputs == 1:
+            # a single output PLA may omit the output column
+            fields.append('1')
+        if len(fields) != 2:
+            raise ValueError("expected 'inputs outputs', got {!r}".format(line))
+        pla.add_cube(fields[0], fields[1])
+
+    if pla is None:
+        pla = _new_pla(header)
+    return pla
+
+
+def _new_pla(header):
+    try:
+        inputs = int(header['.i'][0])
+        outputs = int(header.get('.o', ['1'])[0])
+    except (KeyError, IndexError, ValueError):
+        raise ValueError("a PLA needs '.i' and '.o' before its cubes")
+    pla_type = header.get('.type', ['fd'])[0]
+    if pla_type not in ('f', 'fd', 'fr', 'fdr'):
+        raise ValueError("unknown PLA type {!r}".format(pla_type))
+    input_names = header.get('.ilb')
+    output_names = header.get('.ob')
+    if input_names is not None and len(input_names) != inputs:
+        raise ValueError("'.ilb' names {} inputs, expected {}".format(len(input_names), inputs))
+    if output_names is not None and len(output_names) != outputs:
+        raise ValueError("'.ob' names {} outputs, expected {}".format(len(output_names), outputs))
+    return Pla(inputs, outputs, input_names, output_names, pla_type)
+
+
+def read_blif(stream):
+    """ Read a two-level BLIF model into a Pla.
+
+    Every '.names' block must depend on primary inputs only. A block with
+    output column '0' lists the OFF-set of its output, which is then
+    complemented into ON cubes.
+    """
+    inputs = outputs = None
+    blocks = {}
+    current = None
+    for line in _lines(stream):
+        fields = line.split()
+        keyword = fields[0]
+        if keyword == '.inputs':
+            inputs = (inputs or []) + fields[1:]
+        elif keyword == '.outputs':
+            outputs = (outputs or []) + fields[1:]
+        elif keyword == '.names':
+            if len(fields) < 2:
+                raise ValueError("'.names' needs an output")
+            current = (fields[1:-1], [])
+            blocks[fields[-1]] = current
+        elif keyword == '.end':
+            break
+        elif keyword in ('.model', '.exdc'):
+            current = None
+            if keyword == '.exdc':
+                break  # external don't cares are not supported, stop at them
+        elif keyword.startswith('.'):
+            raise ValueError("unsupported BLIF construct {!r}".format(keyword))
+        elif current is None:
+            raise ValueError("cube {!r} outside of a '.names' block".format(line))
+        else:
+            current[1].append(fields)
+    if inputs is None or outputs is None:
+        raise ValueError("a BLIF model needs '.inputs' and '.outputs'")
+
+    position = dict((name, i) for i, name in enumerate(inputs))
+    pla = Pla(len(inputs), len(outputs), inputs, outputs, 'f')
+    for output, name in enumerate(outputs):
+        if name not in blocks:
+            raise ValueError("no '.names' block for output {!r}".format(name))
+        names, rows = blocks[name]
+        for other in names:
+            if other not in position:
+                raise ValueError("{!r} depends on {!r}, only two-level models "
+                                 "of the primary inputs are supported".format(name, other))
+
+        cubes = []
+        polarity = None
+        for row in rows:
+            cube, value = (row[0], row[1]) if names else ('', row[0])
+            if len(cube) != len(names) or value not in ('0', '1'):
+                raise ValueError("bad cube {!r} for {!r}".format(' '.join(row), name))
+            if polarity is not None and value != polarity:
+                raise ValueError("mixed ON and OFF cubes for {!r}".format(name))
+            polarity = value
+            # spread the cube over all the inputs of the model
+            full = ['-'] * len(inputs)
+            for other, c in zip(names, cube):
+                full[position[other]] = c
+            term = cube_to_implicant(''.join(full))
+            cubes.append((term.value, term.mask))
+
+        if polarity == '0':
+            cubes = _complement(cubes)
+        pla.on[output] = [Implicant(v, m, len(inputs)) for v, m in cubes]
+    return pla
+
+
+def write_pla(stream, covers, input_names, output_names=None):
+    """ Write one cover per output as a PLA of type 'f'.
+
+    covers holds Terms or Implicants, a term found in several covers
+    is written once with a 1 for each of its outputs.
+    """
+    inputs = len(input_names)
+    if output_names is None:
+        output_names = ['f{}'.format(i) for i in range(len(covers))]
+    rows = {}
+    for output, cover in enumerate(covers):
+        for term in cover:
+            term = str(term).replace('*', '-')
+            if len(term) != inputs:
+                raise ValueError("expected {} inputs, got {!r}".format(inputs, term))
+            rows.setdefault(term, ['0'] * len(covers))[output] = '1'
+
+    stream.write(".i {}\n.o {}\n".format(inputs, len(covers)))
+    stream.write(".ilb {}\n.ob {}\n".format(' '.join(input_names), ' '.join(output_names)))
+    stream.write(".p {}\n".format(len(rows)))
+    for term in sorted(rows):
+        stream.write("{} {}\n".format(term, ''.join(rows[term])))
+    stream.write(".e\n")
+
+
+def minimize_pla(pla, max_iterations=20):
+    """ Espresso cover of every output of a Pla, as lists of Implicants. """
+    covers = []
+    for output in range(pla.outputs):
+        on = [(t.value, t.mask) for t in pla.on[output]]
+        not_cares = [(t.value, t.mask) for t in pla.not_cares(output)]
+        cover = espresso(on, not_cares, max_iterations) if on else []
+        covers.append([Implicant(v, m, pla.inputs) for v, m in cover])
+    return covers
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='kmap_pla', description="Minimize the outputs of a PLA or BLIF file.")
+    parser.add_argument('input', nargs='?', default='-',
+                        help="file to read, '-' or nothing for stdin")
+    parser.add_argument('-o', '--output', default='-',
+                        help="PLA file to write, '-' or nothing for stdout")
+    parser.add_argument('--blif', action='store_true',
+                        help="read BLIF, the default for files ending in .blif")
+    args = parser.parse_args(argv)
+
+    stream = sys.stdin if args.input == '-' else open(args.input)
+    try:
+        if args.blif or args.input.endswith('.blif'):
+            pla = read_blif(stream)
+        else:
+            pla = read_pla(stream)
+    except ValueError as error:
+        sys.stderr.write("kmap_pla: {}\n".format(error))
+        return 1
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    covers = minimize_pla(pla)
+    out = sys.stdout if args.output == '-' else open(args.output, 'w')
+    try:
+        write_pla(out, covers, pla.input_names, pla.output_names)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
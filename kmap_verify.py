@@ -0,0 +1,172 @@
+#!/usr/local/bin/python3
+
+
+# Check minimized results against the function they came from.
+#
+# A result is compiled into numpy bit operations over the packed truth
+# table: minterm m is bit m % 64 of word m // 64, and every variable is
+# a packed table of its own. A product ANDs its literals, a sum ORs them,
+# so one sweep over the words evaluates the result on all 2^n inputs.
+# Author: Anuj Gautam
+
+from functools import lru_cache
+import re
+
+import numpy as np
+
+from kmap_core import _to_cube, number_of_variables, variable_names
+
+MAX_VERIFY_VARIABLES = 28  # 2^28 inputs take 32 MB per packed table
+# the tables of all the variables of a width are kept up to 2^20 inputs,
+# 128 KB each and 2.5 MB for the 20 of them, above it they are built on
+# demand, one literal at a time
+CACHED_VARIABLES = 20
+
+_ALL = np.uint64(0xFFFFFFFFFFFFFFFF)
+_LITERAL = re.compile(r"(x\d+|[A-Z])(')?")
+
+
+def _words(nov):
+    return max(1, (1 << nov) // 64)
+
+
+def _valid(nov):
+    # the bits of the last word that are minterms
+    if nov >= 6:
+        return _ALL
+    return np.uint64((1 << (1 << nov)) - 1)
+
+
+def _variable_table(nov, i):
+    bit = nov - 1 - i
+    if bit < 6:
+        pattern = sum(1 << k for k in range(64) if k >> bit & 1)
+        table = np.full(_words(nov), pattern, dtype=np.uint64)
+    else:
+        index = np.arange(_words(nov), dtype=np.uint64)
+        table = np.where((index >> np.uint64(bit - 6)) & np.uint64(1), _ALL, np.uint64(0))
+    table.setflags(write=False)
+    return table
+
+
+@lru_cache(maxsize=8)
+def _cached_tables(nov):
+    return tuple(_variable_table(nov, i) for i in range(nov))
+
+
+def variable_table(nov, i):
+    """ Packed truth table of variable i, in the order of a term. """
+    if nov > MAX_VERIFY_VARIABLES:
+        raise ValueError("Verification supports at most {} variables".format(
+            MAX_VERIFY_VARIABLES))
+    if nov <= CACHED_VARIABLES:
+        return _cached_tables(nov)[i]
+    return _variable_table(nov, i)
+
+
+def truth_table(mt, nov):
+    """ Packed truth table with the bits of the minterms mt set. """
+    table = np.zeros(_words(nov), dtype=np.uint64)
+    mt = np.asarray(list(mt), dtype=np.uint64)
+    if mt.size:
+        if int(mt.max()) >= 1 << nov:
+            raise ValueError("minterm {} needs more than {} variables".format(int(mt.max()), nov))
+        np.bitwise_or.at(table, (mt >> np.uint64(6)).astype(np.intp),
+                         np.left_shift(np.uint64(1), mt & np.uint64(63)))
+    return table
+
+
+def _literals_table(literals, nov, product):
+    # AND (product) or OR (sum) of (variable, complemented) literals
+    table = np.full(_words(nov), _ALL if product else np.uint64(0), dtype=np.uint64)
+    for i, complemented in literals:
+        literal = variable_table(nov, i)
+        literal = ~literal if complemented else literal
+        if product:
+            table &= literal
+        else:
+            table |= literal
+    return table
+
+
+def evaluate_cover(terms, nov):
+    """ Packed truth table of the OR of Terms or Implicants. """
+    table = np.zeros(_words(nov), dtype=np.uint64)
+    for term in terms:
+        value, mask = _to_cube(term)
+        literals = [(i, not value >> (nov - 1 - i) & 1)
+                    for i in range(nov) if mask >> (nov - 1 - i) & 1]
+        table |= _literals_table(literals, nov, True)
+    return table & _valid(nov)
+
+
+def _parse_literals(text, names):
+    literals = []
+    for name, complemented in _LITERAL.findall(text):
+        if name not in names:
+            raise ValueError("unknown variable {!r}".format(name))
+        literals.append((names[name], bool(complemented)))
+    if not literals or _LITERAL.sub('', text).strip():
+        raise ValueError("can't read {!r}".format(text))
+    return literals
+
+
+def evaluate(expr, nov):
+    """ Packed truth table of an SOP from wordify or a POS from wordify_pos. """
+    names = dict((name, i) for i, name in enumerate(variable_names(nov)))
+    expr = expr.strip()
+    if expr in ('0', '1'):
+        return np.full(_words(nov), _ALL if expr == '1' else np.uint64(0),
+                       dtype=np.uint64) & _valid(nov)
+
+    if '(' in expr:
+        # a product of sums, a sum of one literal has no parentheses
+        table = np.full(_words(nov), _ALL, dtype=np.uint64)
+        for sum_text, single in re.findall(r"\(([^)]*)\)|(x\d+'?|[A-Z]'?)", expr):
+            if sum_text:
+                literals = _parse_literals(sum_text.replace('+', ' '), names)
+            else:
+                literals = _parse_literals(single, names)
+            table &= _literals_table(literals, nov, False)
+    else:
+        table = np.zeros(_words(nov), dtype=np.uint64)
+        for product in expr.split('+'):
+            table |= _literals_table(_parse_literals(product, names), nov, True)
+    return table & _valid(nov)
+
+
+def mismatches(table, mt, dc=(), nov=None):
+    """ Minterms where a packed table differs from the function,
+    1s it misses and 0s it covers, "don't cares" are never counted. """
+    mt, dc = list(mt), list(dc)
+    if not nov:
+        nov = number_of_variables(max(mt + dc or [0]))
+    diff = (table ^ truth_table(mt, nov)) & ~truth_table(dc, nov) & _valid(nov)
+    bits = np.unpackbits(diff.astype('<u8').view(np.uint8), bitorder='little')
+    return np.flatnonzero(bits).tolist()
+
+
+def verify(expr, mt, dc=(), nov=None):
+    """ Minterms where the SOP or POS expr differs from the function. """
+    mt, dc = list(mt), list(dc)
+    if not nov:
+        nov = number_of_variables(max(mt + dc or [0]))
+    return mismatches(evaluate(expr, nov), mt, dc, nov)
+
+
+def verify_cover(terms, mt, dc=(), nov=None):
+    """ Minterms where the OR of terms differs from the function. """
+    mt, dc = list(mt), list(dc)
+    if not nov:
+        nov = number_of_variables(max(mt + dc or [0]))
+    return mismatches(evaluate_cover(terms, nov), mt, dc, nov)
+
+
+def check(expr, mt, dc=(), nov=None):
+    """ Raise ValueError when expr differs from the function. """
+    wrong = verify(expr, mt, dc, nov)
+    if wrong:
+        shown = ', '.join(str(m) for m in wrong[:8])
+        if len(wrong) > 8:
+            shown += ', ... ({} in all)'.format(len(wrong))
+        raise ValueError("{!r} differs from the function on minterms {}".format(expr, shown))